@@ -1,15 +1,29 @@
 import os
-import json
 import time
-import hmac
-import base64
-import hashlib
-import requests
-import random
+import threading
+import uuid
+from functools import partial
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from dotenv import load_dotenv
 import logging
+from logs import setup_logging, correlation_id, sampler
+from proxy_pool import ProxyPool
+from transport import Transport
+from racer import RouteRacer, route_kwargs, REQUEST_TIMEOUT
+from breaker import BreakerSet, CircuitOpen, CLOSED
+from instruments import InstrumentRegistry
+from rate_limit import RateLimiter, endpoint_group
+from pipeline import QueueFull
+from dispatcher import SymbolDispatcher
+from metrics import StageMetrics
+from clock import ClockSync, TIMESTAMP_ERROR_CODES
+from signer import OKXSigner
+from ws_private import PrivateStream, private_ws_url
+from ws_public import MarketData, public_ws_url, parse_symbols
+from dedup import create_store, signal_key, client_order_id, is_body_key
+from journal import OrderJournal
+import serializer
 
 # SSL 경고 숨기기
 import urllib3
@@ -18,12 +32,8 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # 환경변수 로드
 load_dotenv()
 
-# 로깅 설정 - Render용
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+# 로깅 설정 - Render용 (큐 핸들러 + 리스너 스레드, LOG_FORMAT=json|text)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -38,79 +48,76 @@ FREE_PROXIES = [
     "47.74.152.29:8888"
 ]
 
-def get_working_proxy():
-    """작동하는 프록시를 찾아 반환"""
-    proxies_to_try = random.sample(FREE_PROXIES, min(3, len(FREE_PROXIES)))
-    
-    for proxy in proxies_to_try:
-        try:
-            proxies = {
-                'http': f'http://{proxy}',
-                'https': f'http://{proxy}'
-            }
-            # 빠른 테스트
-            response = requests.get('http://httpbin.org/ip', proxies=proxies, timeout=5)
-            if response.status_code == 200:
-                logger.info(f"✅ 작동하는 프록시 발견: {proxy}")
-                return proxies
-        except:
-            continue
-    
-    logger.warning("⚠️ 작동하는 프록시를 찾지 못함. 직접 연결 시도")
-    return None
+# OKX_USE_PROXY=0 이면 프록시 없이 직접 연결만 사용 (로컬 벤치마크 등)
+proxy_pool = ProxyPool(FREE_PROXIES if os.getenv('OKX_USE_PROXY', '1') == '1' else [])
+http_transport = Transport()
+rate_limiter = RateLimiter()
+stage_metrics = StageMetrics()
+# 서킷 브레이커: 경로(프록시별, 직접 연결)와 엔드포인트 그룹(trade, account, ...)별
+route_breakers = BreakerSet()
+endpoint_breakers = BreakerSet()
+route_racer = RouteRacer(proxy_pool, route_breakers)
+# 신호·주문·ack를 남기는 로컬 장부 (워커가 죽어도 무엇을 보냈는지 남는다)
+order_journal = OrderJournal()
 
-def make_request_with_proxy(method, url, **kwargs):
-    """프록시를 사용해서 요청을 보내는 함수"""
-    # 먼저 프록시로 시도
-    proxy = get_working_proxy()
-    if proxy:
-        try:
-            kwargs['proxies'] = proxy
-            kwargs['timeout'] = kwargs.get('timeout', 15)
-            
-            if method.upper() == 'GET':
-                response = requests.get(url, **kwargs)
-            else:
-                response = requests.post(url, **kwargs)
-            
-            logger.info(f"✅ 프록시로 요청 성공: {response.status_code}")
-            return response
-        except Exception as e:
-            logger.warning(f"⚠️ 프록시 요청 실패: {e}")
+# 같은 clOrdId로 이미 접수된 주문이 있을 때 OKX가 돌려주는 sCode
+DUPLICATE_CLORDID_CODE = '51016'
+# 주문 조회: 주문이 없음
+ORDER_NOT_FOUND_CODE = '51603'
+
+def new_client_order_id():
+    """OKX clOrdId 규칙(영숫자 32자 이하)에 맞는 새 클라이언트 주문 id"""
+    return uuid.uuid4().hex
+
+def make_request_with_proxy(method, url, transport=None, **kwargs):
+    """프록시·직접 연결 경로로 요청을 보내는 함수 (조회는 상위 경로끼리 경쟁, 주문은 빠른 전환)"""
+    transport = transport or http_transport
+    breaker, trial = endpoint_breaker(url)
+    # 엔드포인트 그룹별 한도가 남아 있으면 대기 없이 통과
+    with stage_metrics.time('rate_limit'):
+        rate_limiter.acquire(url)
     
-    # 프록시 실패시 직접 연결
     try:
-        kwargs.pop('proxies', None)  # 프록시 설정 제거
-        kwargs['timeout'] = kwargs.get('timeout', 10)
-        
-        # User-Agent 추가로 봇 탐지 회피
-        if 'headers' not in kwargs:
-            kwargs['headers'] = {}
-        kwargs['headers'].update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-        
-        # 랜덤 지연 추가
-        time.sleep(random.uniform(1, 3))
-        
-        if method.upper() == 'GET':
-            response = requests.get(url, **kwargs)
-        else:
-            response = requests.post(url, **kwargs)
-        
-        logger.info(f"✅ 직접 연결로 요청 성공: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"❌ 직접 연결도 실패: {e}")
+        response = route_racer.request(transport, method, url, stage_metrics, **kwargs)
+    except CircuitOpen:
+        # 경로가 막혀서 보내지 못했으면 엔드포인트의 시험 요청 자리를 돌려준다
+        if trial:
+            breaker.release()
         raise
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(response.status_code < 500)
+    logger.debug(f"✅ 요청 성공: {response.status_code}")
+    return response
+
+def endpoint_breaker(url):
+    """엔드포인트 그룹의 서킷과 이 요청이 half-open 시험 요청인지 (열려 있으면 요청 없이 CircuitOpen)"""
+    group = endpoint_group(url) or 'other'
+    breaker = endpoint_breakers.get(group)
+    # 닫혀 있지 않은데 allow()가 통과시키면 이 요청이 시험 자리를 차지한 것
+    trial = breaker.state != CLOSED
+    if not breaker.allow():
+        raise CircuitOpen(f"{group} 엔드포인트 서킷이 열려 있음")
+    return breaker, trial
+
+instrument_registry = InstrumentRegistry(
+    os.getenv('OKX_BASE_URL', 'https://www.okx.com'),
+    make_request_with_proxy
+)
+clock_sync = ClockSync(
+    os.getenv('OKX_BASE_URL', 'https://www.okx.com'),
+    make_request_with_proxy
+)
 
 class OKXTrader:
-    def __init__(self):
+    # batch-orders 한 번에 보낼 수 있는 최대 주문 수
+    BATCH_ORDER_LIMIT = 20
+
+    def __init__(self, transport=None, instruments=None, clock=None):
+        self.transport = transport or http_transport
+        self.instruments = instruments or instrument_registry
+        self.clock = clock or clock_sync
         self.api_key = os.getenv('OKX_API_KEY')
         self.secret_key = os.getenv('OKX_API_SECRET')
         self.passphrase = os.getenv('OKX_API_PASSPHRASE')
@@ -118,69 +125,73 @@ class OKXTrader:
         self.simulated = os.getenv('OKX_SIMULATED', '1')
         self.default_tdmode = os.getenv('DEFAULT_TDMODE', 'isolated')
         self.default_market = os.getenv('DEFAULT_MARKET', 'swap')
+        self.signer = OKXSigner(self.api_key, self.secret_key, self.passphrase, self.simulated)
+        # OKX_EXEC_MODE=ws 이면 주문을 프라이빗 웹소켓으로 보내고, 연결이 없으면 REST로 보냄
+        self.exec_mode = os.getenv('OKX_EXEC_MODE', 'rest')
+        # OKX_WS_PRIVATE=1 이면 포지션/잔고를 프라이빗 웹소켓 장부에서 읽음
+        self.private_stream = None
+        if os.getenv('OKX_WS_PRIVATE', '0') == '1' or self.exec_mode == 'ws':
+            self.private_stream = PrivateStream(
+                private_ws_url(self.simulated), self.api_key, self.passphrase, self.signer, self.clock
+            )
+        # OKX_WS_PUBLIC=1 이면 현재가를 퍼블릭 웹소켓 시세표에서 읽음 (OKX_WS_TICKERS: 미리 구독할 심볼)
+        self.market_data = None
+        if os.getenv('OKX_WS_PUBLIC', '0') == '1':
+            self.market_data = MarketData(
+                public_ws_url(self.simulated), parse_symbols(os.getenv('OKX_WS_TICKERS'))
+            )
         
         logger.info(f"🚀 OKXTrader 초기화 - 시뮬레이션 모드: {'ON' if self.simulated == '1' else 'OFF'}")
-        logger.info(f"📊 마켓: {self.default_market}, 거래모드: {self.default_tdmode}")
+        logger.info(f"📊 마켓: {self.default_market}, 거래모드: {self.default_tdmode}, 주문 경로: {self.exec_mode}")
+        self.pid = os.getpid()
+
+    def start(self):
+        """백그라운드 작업(프록시 헬스체크, 상품 정보 갱신, 시계 동기화) 시작"""
+        proxy_pool.start()
+        self.instruments.base_url = self.base_url
+        self.instruments.start()
+        self.clock.base_url = self.base_url
+        self.clock.start()
+        if self.private_stream is not None:
+            self.private_stream.start()
+        if self.market_data is not None:
+            self.market_data.start()
+
+    def stop(self):
+        """이 트레이더만 쓰는 연결 정리 (reload 시 이전 트레이더에 호출)"""
+        if self.private_stream is not None:
+            self.private_stream.stop()
+        if self.market_data is not None:
+            self.market_data.stop()
 
     def get_timestamp(self):
-        return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        """OKX 서버 시각 기준 타임스탬프 (로컬 시계 + 동기화된 offset)"""
+        return self.clock.timestamp()
 
     def sign_request(self, method, path, body=""):
-        timestamp = self.get_timestamp()
-        message = timestamp + method + path + body
-        signature = base64.b64encode(
-            hmac.new(self.secret_key.encode(), message.encode(), hashlib.sha256).digest()
-        ).decode()
-        return {
-            'OK-ACCESS-KEY': self.api_key,
-            'OK-ACCESS-SIGN': signature,
-            'OK-ACCESS-TIMESTAMP': timestamp,
-            'OK-ACCESS-PASSPHRASE': self.passphrase,
-            'Content-Type': 'application/json',
-            'x-simulated-trading': self.simulated
-        }
+        with stage_metrics.time('sign'):
+            return self.signer.headers(self.get_timestamp(), method, path, body)
 
     def get_instrument_info(self, symbol):
-        """코인의 주문 규칙을 알아내는 함수"""
-        try:
-            response = make_request_with_proxy(
-                'GET',
-                f"{self.base_url}/api/v5/public/instruments?instType=SWAP&instId={symbol}",
-                verify=False
-            )
-            
-            # 디버그: 실제 응답 확인
-            logger.info(f"OKX API 응답 코드: {response.status_code}")
-            logger.info(f"OKX API 응답 내용: {response.text[:300]}")
-            
-            if response.text.strip() == "":
-                logger.warning(f"⚠️ 빈 응답 받음: {symbol}. 기본 규칙 사용!")
-                return {'minSz': '0.001', 'lotSz': '0.001'}
-            
-            data = response.json()
-            if data['code'] == '0' and data.get('data'):
-                logger.info(f"✅ 심볼 정보 조회 성공: {symbol}")
-                return data['data'][0]
-            
-            logger.warning(f"⚠️ 조회 실패로 기본 규칙 사용: {symbol}")
-            return {'minSz': '0.001', 'lotSz': '0.001'}
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON 파싱 오류: {e}")
-            return {'minSz': '0.001', 'lotSz': '0.001'}
-        except Exception as e:
-            logger.error(f"❌ 심볼 정보 조회 오류: {e}")
-            return {'minSz': '0.001', 'lotSz': '0.001'}
+        """코인의 주문 규칙을 알아내는 함수 (메모리 캐시에서 조회)"""
+        with stage_metrics.time('instrument'):
+            return self.instruments.get(symbol)
 
     def get_ticker(self, symbol):
-        """현재가 조회"""
+        """현재가 조회 (웹소켓 시세가 최신이면 메모리에서, 아니면 REST)"""
+        if self.market_data is not None:
+            tick = self.market_data.ticker(symbol)
+            if tick is not None:
+                return tick.last
+            self.market_data.watch(symbol)
         try:
             response = make_request_with_proxy(
                 'GET',
                 f"{self.base_url}/api/v5/market/ticker?instId={symbol}",
+                transport=self.transport,
                 verify=False
             )
-            data = response.json()
+            data = serializer.loads(response.content)
             if data['code'] == '0' and data.get('data'):
                 price = float(data['data'][0]['last'])
                 logger.info(f"💰 {symbol} 현재가: {price}")
@@ -191,81 +202,270 @@ class OKXTrader:
             return None
 
     def get_positions(self, symbol=None):
-        """포지션 조회"""
-        method = "GET"
+        """포지션 조회 (웹소켓 장부가 최신이면 메모리에서, 아니면 REST)"""
+        if self.private_stream is not None:
+            cached = self.private_stream.positions(symbol)
+            if cached is not None:
+                return cached
+        
         path = "/api/v5/account/positions"
         if symbol:
             path += f"?instId={symbol}"
-        headers = self.sign_request(method, path)
         try:
-            response = make_request_with_proxy(
-                'GET',
-                self.base_url + path,
-                headers=headers,
-                verify=False
-            )
-            result = response.json()
-            logger.info(f"📊 포지션 조회 완료")
+            result = self.signed_request("GET", path)
+            if sampler.sample('positions'):
+                logger.info("📊 포지션 조회 완료", extra={'event': 'positions', 'result': result})
             return result
         except Exception as e:
             logger.error(f"❌ 포지션 조회 오류: {e}")
             return {"code": "error", "msg": str(e)}
 
     def close_position(self, symbol, side):
-        """포지션 청산"""
+        """포지션 청산 (포지션별 close-position 요청을 동시에 전송)"""
         positions = self.get_positions(symbol)
-        logger.info(f"📋 포지션 조회 결과: {positions}")
         if positions['code'] != '0':
             return positions
         
-        closed_orders = []
-        for pos in positions.get('data', []):
-            if pos['instId'] == symbol and float(pos['pos']) != 0:
-                pos_side = pos['posSide']
-                pos_size = abs(float(pos['pos']))
-                close_side = "sell" if pos_side == "long" else "buy"
-                logger.info(f"🔄 포지션 청산 시도: {pos_side} {pos_size} → {close_side}")
-                
-                result = self.place_order(
-                    symbol=symbol,
-                    side=close_side,
-                    amount=pos_size,
-                    order_type="market",
-                    td_mode=pos.get('mgnMode', self.default_tdmode)
-                )
-                closed_orders.append(result)
-        
-        if not closed_orders:
+        targets = [
+            pos for pos in positions.get('data', [])
+            if pos['instId'] == symbol and float(pos['pos']) != 0
+        ]
+        if not targets:
             logger.info("ℹ️ 청산할 포지션이 없습니다")
             return {"code": "0", "msg": "청산할 포지션이 없습니다"}
         
+        closed_orders = self.transport.fan_out([partial(self.close_one, pos) for pos in targets])
         return {"code": "0", "data": closed_orders}
 
-    def place_order(self, symbol, side, amount, price=None, order_type="market", td_mode=None):
-        """주문 실행"""
-        logger.info(f"🎯 주문 시작: {side.upper()} {amount} {symbol}")
-        
-        # 심볼 정보 조회
-        instrument_info = self.get_instrument_info(symbol)
+    def close_body(self, pos):
+        """포지션 하나를 시장가로 전량 청산하는 close-position 요청 body"""
+        return {
+            "instId": pos['instId'],
+            "mgnMode": pos.get('mgnMode') or self.default_tdmode,
+            "posSide": pos.get('posSide') or "net",
+            "autoCxl": True,
+            # 청산도 주문 장부에 남기고 재시작 후 clOrdId로 조회할 수 있게
+            "clOrdId": new_client_order_id()
+        }
+
+    def close_one(self, pos):
+        """포지션 하나 청산"""
+        body = self.close_body(pos)
+        logger.info(f"🔄 포지션 청산 시도: {body['posSide']} {pos['pos']} {body['instId']}")
+        order_journal.orders([body])
+        try:
+            try:
+                result = self.post("/api/v5/trade/close-position", body)
+            except Exception as e:
+                order_journal.failed([body], e)
+                raise
+            self.record_acks([body], result)
+            if result.get('code') == '0':
+                logger.info(f"✅ 청산 성공! {result}")
+            else:
+                logger.error(f"❌ 청산 실패: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"❌ 청산 실행 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    def prepare_batch(self, orders, instrument_infos):
+        """배치 주문을 검증해서 주문별 결과(legs)와 BATCH_ORDER_LIMIT개씩 나눈 묶음을 만든다"""
+        legs = []
+        valid = []
+        for order, instrument_info in zip(orders, instrument_infos):
+            body, error = self.build_order(
+                instrument_info,
+                order['symbol'],
+                order['action'],
+                order['quantity'],
+                order.get('price'),
+                order.get('order_type', 'market'),
+                cl_ord_id=order.get('cl_ord_id')
+            )
+            leg = {"instId": order['symbol'], "side": order['action'], "sz": body['sz'] if body else None}
+            if error:
+                leg.update(code=error['code'], msg=error['msg'])
+            else:
+                valid.append((leg, body))
+            legs.append(leg)
+        chunks = [valid[i:i + self.BATCH_ORDER_LIMIT] for i in range(0, len(valid), self.BATCH_ORDER_LIMIT)]
+        return legs, chunks
+
+    def apply_batch_result(self, chunk, result):
+        """batch-orders 응답을 순서대로 각 주문 결과에 반영"""
+        data = result.get('data') or []
+        for i, (leg, _) in enumerate(chunk):
+            if i < len(data):
+                leg.update(
+                    code=data[i].get('sCode'), msg=data[i].get('sMsg'),
+                    ordId=data[i].get('ordId'), clOrdId=data[i].get('clOrdId')
+                )
+            else:
+                leg.update(code=result.get('code', 'error'), msg=result.get('msg', '응답 없음'))
+
+    def batch_summary(self, legs):
+        failed = sum(1 for leg in legs if leg.get('code') != '0')
+        if failed:
+            logger.error(f"❌ 배치 주문 {failed}/{len(legs)}개 실패")
+            return {"code": "error", "msg": f"{failed}/{len(legs)}개 주문 실패", "data": legs}
+        logger.info(f"✅ 배치 주문 {len(legs)}개 성공!")
+        return {"code": "0", "data": legs}
+
+    def send_batch(self, bodies):
+        try:
+            return self.submit_orders('batch-orders', "/api/v5/trade/batch-orders", bodies)
+        except Exception as e:
+            logger.error(f"❌ 배치 주문 전송 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    def place_batch_orders(self, orders):
+        """여러 주문을 batch-orders로 20개씩 묶어 동시에 전송하고 주문별 결과를 반환"""
+        legs, chunks = self.prepare_batch(
+            orders, [self.get_instrument_info(order['symbol']) for order in orders]
+        )
+        logger.info(f"📤 배치 주문 전송: {len(orders)}개 → {len(chunks)}개 요청")
+        results = self.transport.fan_out([
+            partial(self.send_batch, [body for _, body in chunk]) for chunk in chunks
+        ])
+        for chunk, result in zip(chunks, results):
+            self.apply_batch_result(chunk, result)
+        return self.batch_summary(legs)
+
+    def signed_request(self, method, path, body=None):
+        """서명된 요청을 보내고 JSON 응답을 반환
+
+        타임스탬프 오류로 거절되면 (주문이 접수되지 않은 상태이므로)
+        서버 시각을 즉시 다시 맞추고 한 번만 재서명해서 보낸다.
+        """
+        body_bytes = serializer.dumps(body) if body is not None else b""
+        for attempt in range(2):
+            headers = self.sign_request(method, path, body_bytes)
+            response = make_request_with_proxy(
+                method,
+                self.base_url + path,
+                transport=self.transport,
+                headers=headers,
+                data=body_bytes or None,
+                verify=False
+            )
+            result = serializer.loads(response.content)
+            if result.get('code') not in TIMESTAMP_ERROR_CODES or attempt:
+                return result
+            logger.warning(f"⚠️ 타임스탬프 거절({result.get('code')}), 시계 재동기화 후 재시도")
+            self.clock.sync(force=True)
+        return result
+
+    def post(self, path, body):
+        """서명된 POST 요청을 보내고 JSON 응답을 반환"""
+        return self.signed_request("POST", path, body)
+
+    def assign_client_ids(self, bodies):
+        """웹소켓 주문은 ack를 못 받을 수 있으므로 REST 재전송 때 중복을 막을 clOrdId를 붙인다
+
+        주문 장부를 쓰면 재시작 후 조회할 수 있게 모든 주문에 붙인다.
+        """
+        if self.exec_mode == 'ws' or order_journal.enabled:
+            for body in bodies:
+                body.setdefault('clOrdId', new_client_order_id())
+
+    def submit_orders(self, op, path, bodies):
+        """주문 전송 (OKX_EXEC_MODE=ws면 웹소켓 우선, 연결이 없거나 ack가 없으면 같은 clOrdId로 REST)"""
+        self.assign_client_ids(bodies)
+        order_journal.orders(bodies)
+        stream = self.private_stream
+        if self.exec_mode == 'ws' and stream is not None and stream.ready:
+            try:
+                with stage_metrics.time('ws_order'):
+                    result = stream.request(op, bodies)
+                self.record_acks(bodies, result)
+                return result
+            except Exception as e:
+                logger.warning(f"⚠️ 웹소켓 주문 실패, REST로 재전송: {type(e).__name__} {e}")
+        try:
+            result = self.post(path, bodies[0] if op == 'order' else bodies)
+        except Exception as e:
+            order_journal.failed(bodies, e)
+            raise
+        if self.duplicated_legs(result):
+            result = self.resolve_duplicates(bodies, result)
+        self.record_acks(bodies, result)
+        return result
+
+    def record_acks(self, bodies, result):
+        """주문 ack를 장부에 남기고, 웹소켓 포지션 장부에는 접수된 주문의 심볼이 다음 푸시 전까지 뒤처졌다고 알린다"""
+        order_journal.acks(bodies, result)
+        if self.private_stream is not None:
+            legs = result.get('data') or []
+            for i, body in enumerate(bodies):
+                leg = legs[i] if i < len(legs) else {}
+                # 거절된 주문은 포지션을 바꾸지 않는다 (close-position 응답에는 sCode가 없다)
+                if leg.get('sCode', result.get('code')) == '0':
+                    self.private_stream.order_acked(body['instId'], leg.get('ordId'))
+
+    def duplicated_legs(self, result):
+        """clOrdId 중복(51016)으로 거절된 주문 위치 (웹소켓으로 이미 접수된 주문)"""
+        return [i for i, leg in enumerate(result.get('data') or []) if leg.get('sCode') == DUPLICATE_CLORDID_CODE]
+
+    def resolve_duplicates(self, bodies, result):
+        """REST 재전송이 clOrdId 중복으로 거절된 주문은 이미 접수된 주문을 조회해 성공으로 바꾼다"""
+        data = list(result['data'])
+        for i in self.duplicated_legs(result):
+            order = self.order_by_client_id(bodies[i]['instId'], bodies[i]['clOrdId'])
+            if order is not None:
+                data[i] = {"ordId": order['ordId'], "clOrdId": order['clOrdId'], "sCode": "0", "sMsg": ""}
+                logger.info(f"🔁 웹소켓으로 이미 접수된 주문 확인: {order['clOrdId']} → {order['ordId']}")
+        code = "0" if all(leg.get('sCode') == "0" for leg in data) else result.get('code')
+        return dict(result, code=code, data=data)
+
+    def order_by_client_id(self, inst_id, cl_ord_id):
+        """clOrdId로 주문 조회 (없거나 조회가 거절되면 None)"""
+        try:
+            return self.find_order(inst_id, cl_ord_id)
+        except RuntimeError:
+            return None
+
+    def find_order(self, inst_id, cl_ord_id):
+        """clOrdId로 주문 조회 (접수 안 된 주문이면 None, 조회 자체가 실패하면 예외)"""
+        result = self.signed_request("GET", f"/api/v5/trade/order?instId={inst_id}&clOrdId={cl_ord_id}")
+        if result.get('code') == ORDER_NOT_FOUND_CODE:
+            return None
+        if result.get('code') != '0' or not result.get('data'):
+            raise RuntimeError(f"주문 조회 실패: {result.get('code')} {result.get('msg')}")
+        return result['data'][0]
+
+    def get_balance(self):
+        """잔고 조회 (웹소켓 장부가 최신이면 메모리에서, 아니면 REST)"""
+        if self.private_stream is not None:
+            cached = self.private_stream.balance()
+            if cached is not None:
+                return cached
+        return self.signed_request("GET", "/api/v5/account/balance")
+
+    def build_order(self, instrument_info, symbol, side, amount, price=None, order_type="market", td_mode=None,
+                    cl_ord_id=None):
+        """수량 검증·조정 후 주문 body 생성 (성공: (body, None), 실패: (None, 오류))"""
         if not instrument_info:
             logger.error(f"❌ 주문 실패: {symbol} 심볼 정보 조회 실패")
-            return {"code": "error", "msg": "심볼 정보 조회 실패"}
+            return None, {"code": "error", "msg": "심볼 정보 조회 실패"}
         
-        lot_size = float(instrument_info['lotSz'])
-        min_size = float(instrument_info['minSz'])
+        # 수량은 lot 배수로, 가격은 tick 배수로 정수 연산해서 맞춘다 (float 오차 없이)
+        try:
+            precision = self.instruments.precision(instrument_info)
+            size, adjusted, below_min = precision.size(amount)
+            px = precision.price(price) if price and order_type == "limit" else None
+        except (KeyError, ValueError) as e:
+            logger.error(f"❌ 주문 수량·가격 해석 실패: {symbol} {e}")
+            return None, {"code": "error", "msg": f"주문 수량·가격 해석 실패: {e}"}
         
         # 수량 검증
-        if amount < min_size:
-            logger.error(f"❌ 주문 수량({amount})이 최소 수량({min_size}) 미만")
-            return {"code": "error", "msg": f"주문 수량은 {min_size} 이상이어야 합니다"}
+        if below_min:
+            logger.error(f"❌ 주문 수량({amount})이 최소 수량({precision.min_text}) 미만")
+            return None, {"code": "error", "msg": f"주문 수량은 {precision.min_text} 이상이어야 합니다"}
         
-        if amount % lot_size != 0:
-            adjusted_amount = round(amount / lot_size) * lot_size
-            logger.warning(f"⚠️ 수량 조정: {amount} → {adjusted_amount}")
-            amount = adjusted_amount
+        if adjusted:
+            logger.warning(f"⚠️ 수량 조정: {amount} → {size}")
         
-        method = "POST"
-        path = "/api/v5/trade/order"
         if td_mode is None:
             td_mode = "cash" if self.default_market == "spot" else self.default_tdmode
         
@@ -274,35 +474,78 @@ class OKXTrader:
             "tdMode": td_mode,
             "side": side,
             "ordType": order_type,
-            "sz": str(amount)
+            "sz": size
         }
-        if price and order_type == "limit":
-            body["px"] = str(price)
+        if px is not None:
+            body["px"] = px
+        if cl_ord_id:
+            body["clOrdId"] = cl_ord_id
+        return body, None
+
+    def place_order(self, symbol, side, amount, price=None, order_type="market", td_mode=None, cl_ord_id=None):
+        """주문 실행 (cl_ord_id: 재전송돼도 한 번만 체결되게 하는 OKX clOrdId)"""
+        logger.info(f"🎯 주문 시작: {side.upper()} {amount} {symbol}")
+        
+        body, error = self.build_order(
+            self.get_instrument_info(symbol), symbol, side, amount, price, order_type, td_mode, cl_ord_id
+        )
+        if error:
+            return error
         
-        body_str = json.dumps(body)
-        headers = self.sign_request(method, path, body_str)
-        logger.info(f"📤 주문 전송: {side} {amount} {symbol}")
+        logger.info(f"📤 주문 전송: {side} {body['sz']} {symbol}", extra={'event': 'order_sent', 'order': body})
         
         try:
-            response = make_request_with_proxy(
-                'POST',
-                self.base_url + path,
-                headers=headers,
-                data=body_str,
-                verify=False
-            )
-            result = response.json()
+            result = self.submit_orders('order', "/api/v5/trade/order", [body])
             
-            if result.get('code') == '0':
-                logger.info(f"✅ 주문 성공! {result}")
-            else:
-                logger.error(f"❌ 주문 실패: {result}")
+            if result.get('code') != '0':
+                logger.error("❌ 주문 실패", extra={'event': 'order_result', 'result': result})
+            elif sampler.sample('order_result'):
+                logger.info("✅ 주문 성공!", extra={'event': 'order_result', 'result': result})
             
             return result
         except Exception as e:
             logger.error(f"❌ 주문 실행 오류: {e}")
             return {"code": "error", "msg": str(e)}
 
+_trader = None
+_trader_lock = threading.Lock()
+
+def get_trader():
+    """워커 프로세스당 하나인 OKXTrader 반환
+
+    수명주기:
+    - create_app()에서 (preload면 gunicorn post_fork 훅에서) 워커마다 한 번
+      만들어지고 백그라운드 작업을 시작한다.
+    - fork 이전에 만들어진 경우 워커에서 처음 호출될 때 pid가 달라진 것을 보고
+      새로 만든다 (스레드는 fork를 넘어가지 못함).
+    - /reload 요청이 오면 reload_trader()로 환경변수를 다시 읽어 교체한다.
+    요청 처리 경로에서는 이미 만들어진 객체를 꺼내기만 한다.
+    """
+    global _trader
+    trader = _trader
+    if trader is None or trader.pid != os.getpid():
+        with _trader_lock:
+            if _trader is None or _trader.pid != os.getpid():
+                _trader = OKXTrader()
+                _trader.start()
+                # 이 워커가 시작하기 전에 보내고 ack를 못 받은 주문을 거래소와 맞춘다
+                order_journal.recover(_trader.find_order)
+            trader = _trader
+    return trader
+
+def reload_trader():
+    """.env와 환경변수를 다시 읽어 새 OKXTrader로 교체 (커넥션 풀과 캐시는 유지)"""
+    global _trader
+    load_dotenv(override=True)
+    trader = OKXTrader()
+    trader.start()
+    with _trader_lock:
+        previous, _trader = _trader, trader
+    if previous is not None:
+        previous.stop()
+    logger.info("🔄 OKXTrader 재생성 완료")
+    return trader
+
 def validate_webhook_token(token):
     """웹훅 토큰 검증"""
     expected_token = os.getenv('WEBHOOK_TOKEN', 'piona0413')
@@ -311,10 +554,19 @@ def validate_webhook_token(token):
 def parse_tradingview_webhook(data):
     """TradingView 웹훅 데이터 파싱"""
     try:
-        if isinstance(data, dict):
+        if isinstance(data, (dict, list)):
             webhook_data = data
         else:
-            webhook_data = json.loads(data)
+            webhook_data = serializer.loads(data)
+        
+        # 여러 주문: [{...}, {...}] 또는 {"orders": [...], "token": ...}
+        if isinstance(webhook_data, list):
+            webhook_data = {
+                'orders': webhook_data,
+                'token': webhook_data[0].get('token', '') if webhook_data else ''
+            }
+        if 'orders' in webhook_data:
+            return parse_batch_webhook(webhook_data)
         
         required_fields = ['action', 'symbol']
         for field in required_fields:
@@ -335,6 +587,127 @@ def parse_tradingview_webhook(data):
         logger.error(f"❌ 웹훅 파싱 오류: {e}")
         return None
 
+def parse_batch_webhook(webhook_data):
+    """여러 심볼 주문(바스켓 리밸런싱) 웹훅 파싱"""
+    orders = []
+    for leg in webhook_data['orders']:
+        for field in ['action', 'symbol']:
+            if field not in leg:
+                raise ValueError(f"필수 필드 누락: {field}")
+        action = leg['action'].lower()
+        if action not in ['buy', 'sell']:
+            raise ValueError(f"배치 주문은 buy/sell만 지원: {action}")
+        orders.append({
+            'action': action,
+            'symbol': leg['symbol'],
+            'quantity': float(leg.get('quantity', 0.001)),
+            'price': leg.get('price'),
+            'order_type': leg.get('order_type', 'market')
+        })
+    if not orders:
+        raise ValueError("주문 목록이 비어 있음")
+    
+    return {
+        'action': 'batch',
+        'symbol': ','.join(dict.fromkeys(order['symbol'] for order in orders)),
+        'quantity': len(orders),
+        'orders': orders,
+        'message': webhook_data.get('message', ''),
+        'token': webhook_data.get('token', '')
+    }
+
+SUPPORTED_ACTIONS = ('buy', 'sell', 'close', 'batch')
+
+# TradingView 재전송 등 같은 신호가 다시 오면 거래소 I/O 없이 이전 결과로 응답
+dedup_store = create_store()
+
+def claim_signal(webhook_data, raw, parsed_data):
+    """중복 신호면 이전 기록을 반환, 처음이면 선점하고 신호 키에서 만든 clOrdId를 붙인다"""
+    key = signal_key(webhook_data, raw)
+    # id 없는 신호는 같은 본문이 DEDUP_BODY_TTL 뒤에 진짜 신호로 다시 올 수 있으므로 clOrdId를 새로 만든다
+    # (같은 clOrdId를 다시 쓰면 거래소가 중복으로 거절하거나 이전 주문으로 확인해 버린다)
+    # 창 안의 재전송은 저장소가 처음 선점할 때 기록한 clOrdId를 돌려준다
+    signal_id = client_order_id(f"{key}:{uuid.uuid4().hex}" if is_body_key(key) else key)
+    previous, signal_id = dedup_store.claim(key, signal_id)
+    if previous is not None:
+        logger.warning(f"🔁 중복 신호 무시: {parsed_data['action']} {parsed_data['symbol']} ({previous['status']})")
+        return previous
+    parsed_data['dedup_key'] = key
+    parsed_data['signal_id'] = signal_id
+    parsed_data['cl_ord_id'] = signal_id
+    for i, order in enumerate(parsed_data.get('orders', [])):
+        order['cl_ord_id'] = client_order_id(f"{signal_id}:{i}")
+    order_journal.signal(parsed_data)
+    return None
+
+def finish_signal(parsed_data, result):
+    """성공한 신호는 결과를 기록하고, 실패한 신호는 재전송을 같은 clOrdId로 받을 수 있게 풀어 준다"""
+    key = parsed_data.get('dedup_key')
+    if key is None:
+        return
+    if result is not None and result.get('code') == '0':
+        dedup_store.complete(key, result)
+    else:
+        dedup_store.fail(key)
+
+def duplicate_response(previous):
+    return {
+        "status": "duplicate",
+        "message": "이미 처리한 신호",
+        "signal_id": previous['signal_id'],
+        "state": previous['status'],
+        "data": previous['result']
+    }
+
+def execute_signal(parsed_data):
+    """파싱된 신호를 실제 주문으로 실행하고 OKX 결과를 반환"""
+    result = None
+    # 대기열 워커 스레드에서도 웹훅과 같은 상관관계 id로 로그를 남긴다
+    correlation_id.set(parsed_data.get('correlation_id', '-'))
+    try:
+        with stage_metrics.symbol(parsed_data['symbol']):
+            result = run_signal(parsed_data)
+            # 웹훅 수신부터 거래소 응답까지 (비동기 모드에서는 대기열 시간 포함)
+            if 'received_at' in parsed_data:
+                stage_metrics.observe('ack', time.perf_counter() - parsed_data['received_at'])
+        return result
+    finally:
+        finish_signal(parsed_data, result)
+
+def run_signal(parsed_data):
+    action = parsed_data['action']
+    symbol = parsed_data['symbol']
+    quantity = parsed_data['quantity']
+    
+    logger.info(f"🎯 거래 실행: {action.upper()} {quantity} {symbol}")
+    
+    trader = get_trader()
+    
+    if action in ['buy', 'sell']:
+        return trader.place_order(
+            symbol=symbol,
+            side=action,
+            amount=quantity,
+            price=parsed_data.get('price'),
+            order_type=parsed_data['order_type'],
+            cl_ord_id=parsed_data.get('cl_ord_id')
+        )
+    if action == 'close':
+        return trader.close_position(symbol, 'both')
+    if action == 'batch':
+        return trader.place_batch_orders(parsed_data['orders'])
+    raise ValueError(f"알 수 없는 액션: {action}")
+
+# 신호는 심볼별 FIFO 레인에서 실행 (같은 심볼은 순서대로, 다른 심볼은 동시에)
+# WEBHOOK_MODE=async 이면 검증 후 대기열에 넣고 바로 202 응답, sync면 실행이 끝날 때까지 기다림
+WEBHOOK_MODE = os.getenv('WEBHOOK_MODE', 'sync')
+signal_queue = SymbolDispatcher(execute_signal)
+
+@app.before_request
+def assign_correlation_id():
+    """요청마다 상관관계 id 부여 (X-Request-ID 헤더가 있으면 그 값)"""
+    correlation_id.set(request.headers.get('X-Request-ID') or uuid.uuid4().hex[:12])
+
 @app.route('/', methods=['GET'])
 def home():
     """홈페이지"""
@@ -344,7 +717,9 @@ def home():
             "webhook": "/webhook",
             "status": "/status", 
             "positions": "/positions",
-            "balance": "/balance"
+            "balance": "/balance",
+            "signals": "/signals/<signal_id>",
+            "metrics": "/metrics"
         },
         "timestamp": datetime.now().isoformat()
     })
@@ -352,45 +727,55 @@ def home():
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """TradingView 웹훅 엔드포인트"""
+    received_at = time.perf_counter()
     try:
-        logger.info("📨 웹훅 요청 수신!")
-        
-        letter = request.get_data(as_text=True)
-        if not letter or letter.strip() == "":
+        # 텍스트로 디코딩하지 않고 bytes 그대로 파싱
+        letter = request.get_data()
+        if not letter or not letter.strip():
             return jsonify({"status": "error", "message": "빈 요청"}), 400
         
-        webhook_data = json.loads(letter)
-        logger.info(f"📨 웹훅 데이터: {webhook_data}")
-        
-        parsed_data = parse_tradingview_webhook(webhook_data)
+        with stage_metrics.time('parse'):
+            webhook_data = serializer.loads(letter)
+            if sampler.sample('webhook_payload'):
+                logger.info("📨 웹훅 데이터", extra={'event': 'webhook_payload', 'payload': webhook_data})
+            
+            parsed_data = parse_tradingview_webhook(webhook_data)
         if not parsed_data:
             return jsonify({"status": "error", "message": "잘못된 데이터"}), 400
+        parsed_data['received_at'] = received_at
+        parsed_data['correlation_id'] = correlation_id.get()
         
-        if not validate_webhook_token(parsed_data['token']):
+        with stage_metrics.time('auth'):
+            authorized = validate_webhook_token(parsed_data['token'])
+        if not authorized:
             return jsonify({"status": "error", "message": "토큰 오류"}), 403
         
         action = parsed_data['action']
-        symbol = parsed_data['symbol']
-        quantity = parsed_data['quantity']
-        price = parsed_data.get('price')
-        order_type = parsed_data['order_type']
+        if action not in SUPPORTED_ACTIONS:
+            return jsonify({"status": "error", "message": f"알 수 없는 액션: {action}"}), 400
         
-        logger.info(f"🎯 거래 실행: {action.upper()} {quantity} {symbol}")
+        previous = claim_signal(webhook_data, letter, parsed_data)
+        if previous is not None:
+            return jsonify(duplicate_response(previous))
         
-        trader = OKXTrader()
+        try:
+            if WEBHOOK_MODE == 'async':
+                signal_id = signal_queue.submit(parsed_data, parsed_data['signal_id'])
+            else:
+                result = signal_queue.execute(parsed_data, parsed_data['signal_id'])
+        except QueueFull as e:
+            finish_signal(parsed_data, None)
+            logger.warning(f"⚠️ 신호 거절 (대기열 가득 참): {action} {parsed_data['symbol']}")
+            response = jsonify({"status": "error", "message": str(e)})
+            response.headers['Retry-After'] = '1'
+            return response, 503
         
-        if action in ['buy', 'sell']:
-            result = trader.place_order(
-                symbol=symbol,
-                side=action,
-                amount=quantity,
-                price=price,
-                order_type=order_type
-            )
-        elif action == 'close':
-            result = trader.close_position(symbol, 'both')
-        else:
-            return jsonify({"status": "error", "message": f"알 수 없는 액션: {action}"}), 400
+        if WEBHOOK_MODE == 'async':
+            return jsonify({
+                "status": "accepted",
+                "signal_id": signal_id,
+                "status_url": f"/signals/{signal_id}"
+            }), 202
         
         if result['code'] == '0':
             logger.info(f"✅ 거래 성공!")
@@ -402,27 +787,57 @@ def webhook():
         else:
             return jsonify({
                 "status": "error",
-                "message": f"거래 실패: {result.get('msg', '오류')}"
+                "message": f"거래 실패: {result.get('msg', '오류')}",
+                "data": result.get('data')
             }), 500
             
     except Exception as e:
         logger.error(f"❌ 웹훅 처리 오류: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/signals/<signal_id>', methods=['GET'])
+def signal_status(signal_id):
+    """비동기 모드에서 접수한 신호의 처리 상태 조회"""
+    record = signal_queue.status(signal_id)
+    if record is None:
+        return jsonify({"status": "error", "message": "알 수 없는 신호"}), 404
+    return jsonify(record)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """단계별 지연시간 (Prometheus 텍스트 형식, 워커 프로세스별)"""
+    return Response(stage_metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/status', methods=['GET'])
 def status():
     """서버 상태 확인"""
+    trader = get_trader()
     return jsonify({
         "status": "🟢 RUNNING (프록시 적용)",
         "timestamp": datetime.now().isoformat(),
-        "message": "프록시 기능이 적용된 자동거래 봇"
+        "message": "프록시 기능이 적용된 자동거래 봇",
+        "proxies": proxy_pool.snapshot(),
+        "transport": http_transport.stats(),
+        "routes": route_racer.snapshot(),
+        "breakers": {
+            "routes": route_breakers.snapshot(),
+            "endpoints": endpoint_breakers.snapshot()
+        },
+        "instruments": instrument_registry.snapshot(),
+        "rate_limits": rate_limiter.snapshot(),
+        "clock": clock_sync.snapshot(),
+        "private_ws": trader.private_stream.snapshot() if trader.private_stream else None,
+        "market_ws": trader.market_data.snapshot() if trader.market_data else None,
+        "dedup": dedup_store.snapshot(),
+        "journal": order_journal.snapshot(),
+        "signal_queue": signal_queue.snapshot()
     })
 
 @app.route('/positions', methods=['GET'])
 def get_positions():
     """포지션 조회"""
     try:
-        trader = OKXTrader()
+        trader = get_trader()
         symbol = request.args.get('symbol')
         positions = trader.get_positions(symbol)
         return jsonify(positions)
@@ -433,25 +848,58 @@ def get_positions():
 def get_balance():
     """잔고 조회"""
     try:
-        trader = OKXTrader()
-        method = "GET"
-        path = "/api/v5/account/balance"
-        headers = trader.sign_request(method, path)
-        response = make_request_with_proxy(
-            'GET',
-            trader.base_url + path,
-            headers=headers,
-            verify=False
-        )
-        return jsonify(response.json())
+        trader = get_trader()
+        return jsonify(trader.get_balance())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/reload', methods=['POST'])
+def reload():
+    """환경변수를 다시 읽어 트레이더 재생성"""
+    data = request.get_json(silent=True) or {}
+    token = data.get('token') or request.args.get('token', '')
+    if not validate_webhook_token(token):
+        return jsonify({"status": "error", "message": "토큰 오류"}), 403
+    trader = reload_trader()
+    return jsonify({
+        "status": "success",
+        "message": "트레이더 재생성 완료",
+        "simulated": trader.simulated,
+        "base_url": trader.base_url
+    })
+
 @app.route('/health', methods=['GET'])
 def health():
     """헬스체크"""
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
+def direct_request(method, url, **kwargs):
+    """프록시 풀·경로 경쟁 없이 직접 연결로 한 번 요청 (스레드를 띄우지 않음)"""
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    return http_transport.request(method, url, **route_kwargs(None, kwargs))
+
+def warm_caches():
+    """프로세스 간에 나눠 쓸 수 있는 캐시(상품 규칙)를 미리 채운다
+
+    gunicorn preload로 마스터에서 한 번 채우면 워커들은 fork로 물려받아
+    (copy-on-write) 각자 전체 목록을 다시 받지 않는다. 프록시 풀을 거치면
+    마스터에서 헬스체크 스레드가 뜨므로 직접 연결로 받는다.
+    """
+    instrument_registry.load(fetch=direct_request)
+
+def create_app(start=True):
+    """Flask 앱 팩토리 (gunicorn 'app:create_app()')
+
+    start=False면 캐시만 채우고 스레드를 만들지 않으며 쓴 커넥션도 닫는다. preload 마스터처럼
+    fork 이전에 불릴 때 쓰고, 워커에서는 post_fork 훅이 get_trader()를 부른다.
+    """
+    warm_caches()
+    if start:
+        get_trader()
+    else:
+        http_transport.close()
+    return app
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     
@@ -462,7 +910,7 @@ if __name__ == '__main__':
     print(f"🛡️ Cloudflare 우회: 프록시 + 헤더 변조")
     print("=" * 60)
     
-    app.run(host='0.0.0.0', port=port, debug=False)
+    create_app().run(host='0.0.0.0', port=port, debug=False)
 
 
 
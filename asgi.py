@@ -0,0 +1,155 @@
+# ASGI 진입점 (uvicorn asgi:app)
+# /webhook은 asyncio OKX 클라이언트로 직접 처리해서 한 프로세스가 수백 개의
+# 웹훅을 동시에 진행할 수 있게 하고, 나머지 경로는 기존 Flask 앱으로 넘긴다.
+import uuid
+import serializer
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from collections import defaultdict
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (
+    app as flask_app, create_app as create_flask_app, parse_tradingview_webhook, validate_webhook_token, SUPPORTED_ACTIONS,
+    claim_signal, finish_signal, duplicate_response
+)
+from okx_async import AsyncOKXTrader
+from logs import correlation_id
+from pipeline import signal_symbols
+
+logger = logging.getLogger(__name__)
+
+flask_asgi = WsgiToAsgi(flask_app)
+_async_trader = None
+# 같은 심볼 신호는 도착 순서대로 (asyncio.Lock은 기다린 순서대로 넘겨준다), 다른 심볼은 동시에
+# 배치는 묶음의 심볼마다 락을 정렬된 순서로 잡는다 (순서가 같아서 서로 기다리며 멈추지 않음)
+symbol_locks = defaultdict(asyncio.Lock)
+
+
+def get_async_trader():
+    """이벤트 루프에서 공유하는 AsyncOKXTrader (처음 호출할 때 생성)"""
+    global _async_trader
+    if _async_trader is None:
+        _async_trader = AsyncOKXTrader()
+    return _async_trader
+
+
+async def execute_signal_async(parsed_data):
+    """파싱된 신호를 비동기 클라이언트로 실행"""
+    trader = get_async_trader()
+    action = parsed_data['action']
+    symbol = parsed_data['symbol']
+    logger.info(f"🎯 거래 실행: {action.upper()} {parsed_data['quantity']} {symbol}")
+    if action in ['buy', 'sell']:
+        return await trader.place_order(
+            symbol=symbol,
+            side=action,
+            amount=parsed_data['quantity'],
+            price=parsed_data.get('price'),
+            order_type=parsed_data['order_type'],
+            cl_ord_id=parsed_data.get('cl_ord_id')
+        )
+    if action == 'batch':
+        return await trader.place_batch_orders(parsed_data['orders'])
+    return await trader.close_position(symbol, 'both')
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, payload, status=200):
+    body = serializer.dumps(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode())
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def webhook(receive, send):
+    """TradingView 웹훅 엔드포인트 (비동기)"""
+    # 요청마다 태스크가 따로라 컨텍스트도 요청별로 분리된다
+    correlation_id.set(uuid.uuid4().hex[:12])
+    try:
+        letter = await read_body(receive)
+        if not letter.strip():
+            return await send_json(send, {"status": "error", "message": "빈 요청"}, 400)
+
+        webhook_data = serializer.loads(letter)
+        parsed_data = parse_tradingview_webhook(webhook_data)
+        if not parsed_data:
+            return await send_json(send, {"status": "error", "message": "잘못된 데이터"}, 400)
+
+        if not validate_webhook_token(parsed_data['token']):
+            return await send_json(send, {"status": "error", "message": "토큰 오류"}, 403)
+
+        action = parsed_data['action']
+        if action not in SUPPORTED_ACTIONS:
+            return await send_json(send, {"status": "error", "message": f"알 수 없는 액션: {action}"}, 400)
+
+        previous = claim_signal(webhook_data, letter, parsed_data)
+        if previous is not None:
+            return await send_json(send, duplicate_response(previous))
+
+        result = None
+        try:
+            async with AsyncExitStack() as locks:
+                for symbol in signal_symbols(parsed_data['symbol']):
+                    await locks.enter_async_context(symbol_locks[symbol])
+                result = await execute_signal_async(parsed_data)
+        finally:
+            finish_signal(parsed_data, result)
+        if result['code'] == '0':
+            return await send_json(send, {
+                "status": "success",
+                "message": f"{action.upper()} 완료!",
+                "data": result
+            })
+        return await send_json(send, {
+            "status": "error",
+            "message": f"거래 실패: {result.get('msg', '오류')}",
+            "data": result.get('data')
+        }, 500)
+
+    except Exception as e:
+        logger.error(f"❌ 웹훅 처리 오류: {e}")
+        return await send_json(send, {"status": "error", "message": str(e)}, 500)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # 워커의 OKXTrader(백그라운드 작업)를 첫 요청 전에 시작
+            get_async_trader().trader
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _async_trader is not None:
+                await _async_trader.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http' and scope['path'] == '/webhook' and scope['method'] == 'POST':
+        return await webhook(receive, send)
+    return await flask_asgi(scope, receive, send)
+
+
+def create_app():
+    """ASGI 앱 팩토리 (gunicorn 'asgi:create_app()', 트레이더는 lifespan에서 시작)"""
+    create_flask_app(start=False)
+    return app
@@ -0,0 +1,48 @@
+import json
+import timeit
+
+import serializer
+from fake_okx import INSTRUMENTS
+
+# 표준 json 경로 vs serializer(설치된 빠른 백엔드) 경로 비교
+# - 웹훅 파싱: bytes → 텍스트 디코딩 → json.loads  vs  bytes 그대로 serializer.loads
+# - 주문 body: json.dumps(기본 공백 포함) → 서명용 encode  vs  serializer.dumps(공백 없는 bytes)
+# - 응답 파싱: 주문 응답, 상품 목록(큰 응답)
+#
+#   python bench_json.py
+
+WEBHOOK = json.dumps({
+    "action": "buy",
+    "symbol": "BTC-USDT-SWAP",
+    "quantity": 0.01,
+    "order_type": "market",
+    "token": "piona0413",
+    "message": "테스트 매수 신호"
+}, ensure_ascii=False).encode()
+ORDER_BODY = {"instId": "BTC-USDT-SWAP", "tdMode": "isolated", "side": "buy", "ordType": "market", "sz": "0.01"}
+ORDER_RESPONSE = json.dumps({
+    "code": "0", "msg": "", "data": [{"clOrdId": "", "ordId": "312269865356374016", "tag": "", "sCode": "0", "sMsg": ""}]
+}).encode()
+INSTRUMENTS_RESPONSE = json.dumps({"code": "0", "msg": "", "data": INSTRUMENTS['SWAP'] * 50}).encode()
+
+CASES = [
+    ('웹훅 파싱', lambda: json.loads(WEBHOOK.decode('utf-8')), lambda: serializer.loads(WEBHOOK)),
+    ('주문 body 생성', lambda: json.dumps(ORDER_BODY).encode(), lambda: serializer.dumps(ORDER_BODY)),
+    ('주문 응답 파싱', lambda: json.loads(ORDER_RESPONSE.decode('utf-8')), lambda: serializer.loads(ORDER_RESPONSE)),
+    ('상품 목록 파싱(300개)', lambda: json.loads(INSTRUMENTS_RESPONSE.decode('utf-8')),
+     lambda: serializer.loads(INSTRUMENTS_RESPONSE)),
+]
+
+
+def measure(func, number=20000, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+if __name__ == '__main__':
+    print(f"📦 JSON 백엔드: {serializer.BACKEND}")
+    print(f"{'항목':<20}{'표준(µs)':>12}{'빠른 경로(µs)':>16}{'배율':>8}")
+    for name, standard, fast in CASES:
+        number = 200 if '상품' in name else 20000
+        slow_us = measure(standard, number)
+        fast_us = measure(fast, number)
+        print(f"{name:<20}{slow_us:>12.2f}{fast_us:>16.2f}{slow_us / fast_us:>7.1f}x")
@@ -0,0 +1,89 @@
+import time
+import logging
+import tempfile
+
+from logs import setup_logging, correlation_id, Sampler, ProcessQueueHandler
+from bench_json import ORDER_BODY, ORDER_RESPONSE
+
+import serializer
+
+# 웹훅 1건당 로그 비용 비교 (요청 스레드가 쓰는 시간)
+# - 기존: basicConfig StreamHandler 동기 출력, 페이로드·응답 전체를 매번 INFO로
+# - 개선: QueueHandler + 리스너 스레드, JSON 이벤트, 자세한 로그는 샘플링, HTTP 성공 로그는 DEBUG
+# 출력은 임시 파일로 보낸다 (Render에서는 stdout 파이프).
+#
+#   python bench_logging.py
+
+WEBHOOK = {"action": "buy", "symbol": "BTC-USDT-SWAP", "quantity": 0.01, "token": "piona0413", "message": "테스트 매수 신호"}
+RESULT = serializer.loads(ORDER_RESPONSE)
+REQUESTS = 20000
+
+logger = logging.getLogger('bench')
+
+
+def legacy_request():
+    logger.info("📨 웹훅 요청 수신!")
+    logger.info(f"📨 웹훅 데이터: {WEBHOOK}")
+    logger.info(f"🎯 거래 실행: BUY 0.01 BTC-USDT-SWAP")
+    logger.info(f"🎯 주문 시작: BUY 0.01 BTC-USDT-SWAP")
+    logger.info(f"📤 주문 전송: buy 0.01 BTC-USDT-SWAP")
+    logger.info(f"✅ 프록시로 요청 성공: 200")
+    logger.info(f"✅ 주문 성공! {RESULT}")
+    logger.info(f"✅ 거래 성공!")
+
+
+def structured_request(sampler):
+    correlation_id.set('bench')
+    if sampler.sample('webhook_payload'):
+        logger.info("📨 웹훅 데이터", extra={'event': 'webhook_payload', 'payload': WEBHOOK})
+    logger.info(f"🎯 거래 실행: BUY 0.01 BTC-USDT-SWAP")
+    logger.info(f"🎯 주문 시작: BUY 0.01 BTC-USDT-SWAP")
+    logger.info(f"📤 주문 전송: buy 0.01 BTC-USDT-SWAP", extra={'event': 'order_sent', 'order': ORDER_BODY})
+    logger.debug(f"✅ 요청 성공: 200")
+    if sampler.sample('order_result'):
+        logger.info("✅ 주문 성공!", extra={'event': 'order_result', 'result': RESULT})
+    logger.info(f"✅ 거래 성공!")
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        if isinstance(handler, ProcessQueueHandler):
+            handler.stop()
+
+
+def run(request, output):
+    """요청 스레드 기준 µs/요청과, 리스너가 다 쓸 때까지 포함한 µs/요청"""
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        request()
+    hot = time.perf_counter() - started
+    reset_root()
+    output.flush()
+    drained = time.perf_counter() - started
+    return hot / REQUESTS * 1e6, drained / REQUESTS * 1e6
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as output:
+        reset_root()
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(handler)
+        logging.getLogger().setLevel(logging.INFO)
+        legacy = run(legacy_request, output)
+        legacy_bytes = output.tell()
+
+    cases = [('개선 (샘플링 없음)', Sampler({})), ('개선 (기본 샘플링)', Sampler())]
+    rows = []
+    for name, sampler in cases:
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as output:
+            setup_logging('INFO', 'json', output)
+            rows.append((name, run(lambda: structured_request(sampler), output), output.tell()))
+
+    print(f"🪵 웹훅 1건당 로그 비용 ({REQUESTS}건)")
+    print(f"{'방식':<22}{'요청 스레드(µs)':>16}{'출력 완료까지(µs)':>20}{'bytes/건':>10}")
+    print(f"{'기존 (동기 StreamHandler)':<22}{legacy[0]:>16.1f}{legacy[1]:>20.1f}{legacy_bytes / REQUESTS:>10.0f}")
+    for name, (hot, drained), size in rows:
+        print(f"{name:<22}{hot:>16.1f}{drained:>20.1f}{size / REQUESTS:>10.0f}")
@@ -0,0 +1,76 @@
+import random
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+
+from fake_okx import INSTRUMENTS
+from precision import InstrumentPrecision
+
+# 주문 수량 맞추기: 기존 float 경로 vs 미리 계산한 정수 경로(precision.py)
+# - float: 주문마다 float(lotSz), amount % lot, round(amount / lot) * lot, str()
+# - Decimal: 주문마다 Decimal(lotSz)로 quantize (참고용, 정확하지만 느림)
+# - 정수: 상품 캐시를 채울 때 만든 InstrumentPrecision.size()
+# 정확도는 결과 문자열이 lot 배수의 정규 표기(Decimal 결과)와 같은 비율.
+# 이미 lot 배수인 수량(대부분의 웹훅)과 반올림이 필요한 수량을 따로 잰다.
+#
+#   python bench_precision.py
+
+INFOS = INSTRUMENTS['SWAP'] + INSTRUMENTS['SPOT']
+PRECISION = {info['instId']: InstrumentPrecision.from_info(info) for info in INFOS}
+
+random.seed(7)
+# 웹훅 수량처럼 소수 몇 자리짜리 값들 (0.1 + 0.2 같은 계산 결과 포함)
+AMOUNTS = [round(random.uniform(0.01, 50), random.choice([1, 2, 3])) for _ in range(200)] + [0.1 + 0.2, 0.3, 0.07, 1.1]
+
+
+def float_size(info, amount):
+    lot_size = float(info['lotSz'])
+    min_size = float(info['minSz'])
+    if amount < min_size:
+        return None
+    if amount % lot_size != 0:
+        amount = round(amount / lot_size) * lot_size
+    return str(amount)
+
+
+def decimal_size(info, amount):
+    lot = Decimal(info['lotSz'])
+    if Decimal(repr(amount)) < Decimal(info['minSz']):
+        return None
+    size = (Decimal(repr(amount)) / lot).quantize(Decimal(1), ROUND_HALF_UP) * lot
+    return format(size.normalize(), 'f')
+
+
+def int_size(info, amount):
+    size, adjusted, below_min = PRECISION[info['instId']].size(amount)
+    return None if below_min else size
+
+
+CASES = [(info, amount) for info in INFOS for amount in AMOUNTS]
+ON_LOT = [(info, amount) for info, amount in CASES if Decimal(repr(amount)) % Decimal(info['lotSz']) == 0]
+OFF_LOT = [(info, amount) for info, amount in CASES if Decimal(repr(amount)) % Decimal(info['lotSz']) != 0]
+
+
+def run_all(func, cases):
+    for info, amount in cases:
+        func(info, amount)
+
+
+def accuracy(func):
+    exact = sum(func(info, amount) == decimal_size(info, amount) for info, amount in CASES)
+    return exact / len(CASES) * 100
+
+
+def measure(func, cases, number=20, repeat=5):
+    return min(timeit.repeat(lambda: run_all(func, cases), number=number, repeat=repeat)) / number / len(cases) * 1e6
+
+
+if __name__ == '__main__':
+    compile_us = min(timeit.repeat(lambda: [InstrumentPrecision.from_info(info) for info in INFOS], number=200, repeat=5)) / 200 / len(INFOS) * 1e6
+    print(f"🎯 수량 맞추기 ({len(INFOS)}개 상품 × {len(AMOUNTS)}개 수량), 상품당 규칙 미리 계산 {compile_us:.2f}µs")
+    print(f"{'경로':<12}{'lot 배수(µs)':>14}{'반올림 필요(µs)':>16}{'정확도':>10}")
+    for name, func in [('float', float_size), ('Decimal', decimal_size), ('정수(미리 계산)', int_size)]:
+        print(f"{name:<12}{measure(func, ON_LOT):>14.2f}{measure(func, OFF_LOT):>16.2f}{accuracy(func):>9.1f}%")
+    bad = [(info['lotSz'], amount, float_size(info, amount)) for info in INFOS for amount in AMOUNTS
+           if float_size(info, amount) != decimal_size(info, amount)][:3]
+    for lot, amount, size in bad:
+        print(f"  float 예: lotSz {lot}, 수량 {amount} → sz {size}")
@@ -0,0 +1,62 @@
+import hmac
+import json
+import base64
+import hashlib
+import timeit
+
+from signer import OKXSigner
+
+# 주문 1건당 서명·헤더 생성 비용 비교
+# 기존 방식(요청마다 키 인코딩 + hmac.new + 헤더 dict 조립) vs OKXSigner(미리 키를 넣은 HMAC copy + 고정 템플릿)
+#
+#   python bench_signing.py
+
+API_KEY = 'a' * 36
+SECRET = 'B' * 32
+PASSPHRASE = 'passphrase'
+TIMESTAMP = '2024-01-01T00:00:00.000Z'
+PATH = '/api/v5/trade/order'
+BODY = json.dumps({
+    "instId": "BTC-USDT-SWAP",
+    "tdMode": "isolated",
+    "side": "buy",
+    "ordType": "market",
+    "sz": "0.01"
+})
+
+
+def legacy_sign():
+    message = TIMESTAMP + 'POST' + PATH + BODY
+    signature = base64.b64encode(
+        hmac.new(SECRET.encode(), message.encode(), hashlib.sha256).digest()
+    ).decode()
+    return {
+        'OK-ACCESS-KEY': API_KEY,
+        'OK-ACCESS-SIGN': signature,
+        'OK-ACCESS-TIMESTAMP': TIMESTAMP,
+        'OK-ACCESS-PASSPHRASE': PASSPHRASE,
+        'Content-Type': 'application/json',
+        'x-simulated-trading': '1'
+    }
+
+
+signer = OKXSigner(API_KEY, SECRET, PASSPHRASE)
+
+
+def fast_sign():
+    return signer.headers(TIMESTAMP, 'POST', PATH, BODY)
+
+
+def measure(func, number=200000, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+if __name__ == '__main__':
+    assert legacy_sign() == fast_sign(), "서명 결과가 다름"
+
+    legacy = measure(legacy_sign)
+    fast = measure(fast_sign)
+    print("🔏 주문 1건당 서명 + 헤더 생성 비용")
+    print(f"   기존 방식   : {legacy:.2f} µs")
+    print(f"   OKXSigner  : {fast:.2f} µs")
+    print(f"   개선        : {legacy / fast:.2f}x")
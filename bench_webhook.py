@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import uuid
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fake_okx import start_server
+
+# /webhook 부하 테스트
+# 가짜 OKX 서버를 띄우고 OKX_BASE_URL을 그쪽으로 돌린 뒤, 워커 설정별로 서버를 띄워
+# 지정한 동시성으로 웹훅을 보내 처리량(req/s), 지연 분위수, 오류율을 측정한다.
+#
+#   python bench_webhook.py --configs sync:2,gthread:2x8,uvicorn:2 --concurrency 32 --requests 2000
+#   python bench_webhook.py --gunicorn-conf --configs sync:2,gthread:2x8,uvicorn:2   (gunicorn.conf.py 프리셋으로 실행)
+#   python bench_webhook.py --url http://127.0.0.1:5000   (이미 떠 있는 서버에 부하만)
+
+BENCH_TOKEN = 'bench-token'
+UNLIMITED_RATE_LIMITS = 'trade=1000000/1,account=1000000/1,market=1000000/1,public=1000000/1'
+SYMBOLS = ['BTC-USDT-SWAP', 'ETH-USDT-SWAP', 'SOL-USDT-SWAP', 'XRP-USDT-SWAP', 'DOGE-USDT-SWAP', 'ADA-USDT-SWAP']
+
+
+def server_command(config, port, use_conf=False):
+    """종류:워커수[x스레드수] 형식의 설정을 (서버 실행 명령, 추가 환경변수)로 변환"""
+    kind, _, size = config.partition(':')
+    workers, _, threads = (size or '1').partition('x')
+    bind = f"127.0.0.1:{port}"
+    if use_conf and kind != 'flask':
+        env = {'GUNICORN_PROFILE': kind, 'WEB_CONCURRENCY': workers, 'PORT': str(port)}
+        if threads:
+            env['GUNICORN_THREADS' if kind == 'gthread' else 'GUNICORN_CONNECTIONS'] = threads
+        return ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind, '--log-level', 'warning'], env
+    return legacy_command(kind, workers, threads, bind, port), {}
+
+
+def legacy_command(kind, workers, threads, bind, port):
+    if kind == 'flask':
+        return [sys.executable, '-c', f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    command = ['gunicorn', '--bind', bind, '--workers', workers, '--log-level', 'warning']
+    if kind == 'sync':
+        return command + ['--worker-class', 'sync', 'app:app']
+    if kind == 'gthread':
+        return command + ['--worker-class', 'gthread', '--threads', threads or '8', 'app:app']
+    if kind == 'gevent':
+        return command + ['--worker-class', 'gevent', '--worker-connections', threads or '100', 'app:app']
+    if kind == 'uvicorn':
+        return command + ['--worker-class', 'uvicorn.workers.UvicornWorker', 'asgi:app']
+    raise ValueError(f"알 수 없는 설정: {kind}")
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def drive(url, total, concurrency, symbols):
+    """total개의 웹훅을 concurrency개 스레드로 보내고 결과 요약을 반환"""
+    latencies = []
+    errors = []
+    # 매 요청마다 다른 id를 붙여서 중복 신호로 걸러지지 않게 한다
+    run_id = uuid.uuid4().hex[:8]
+    lock = threading.Lock()
+    local = threading.local()
+    counter = iter(range(total))
+
+    def worker():
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        for i in counter:
+            payload = {
+                'action': 'buy' if i % 2 == 0 else 'sell',
+                'symbol': symbols[i % len(symbols)],
+                'quantity': 0.01 if symbols[i % len(symbols)].startswith(('BTC', 'ETH', 'SOL')) else 1,
+                'token': BENCH_TOKEN,
+                'id': f"{run_id}-{i}"
+            }
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{url}/webhook", json=payload, timeout=30)
+                ok = response.status_code in (200, 202)
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors.append(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    duration = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'duration': duration,
+        'rps': len(latencies) / duration if duration else 0.0,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'error_rate': len(errors) / len(latencies) if latencies else 0.0
+    }
+
+
+def print_report(rows):
+    print()
+    print(f"{'설정':<16}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'오류율':>8}")
+    print("-" * 64)
+    for config, result in rows:
+        print(f"{config:<16}{result['rps']:>10.1f}{result['p50'] * 1000:>10.1f}"
+              f"{result['p95'] * 1000:>10.1f}{result['p99'] * 1000:>10.1f}{result['error_rate']:>8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/webhook 부하 테스트')
+    parser.add_argument('--configs', default='sync:2,gthread:2x8', help='쉼표로 구분한 워커 설정 (sync:N, gthread:NxT, gevent:NxC, uvicorn:N, flask)')
+    parser.add_argument('--gunicorn-conf', action='store_true', help='gunicorn.conf.py 프리셋(GUNICORN_PROFILE)으로 서버 실행')
+    parser.add_argument('--url', help='이미 떠 있는 서버 주소 (지정하면 서버를 띄우지 않음)')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--okx-latency', type=float, default=0.02, help='가짜 OKX 응답 지연 (초)')
+    parser.add_argument('--okx-jitter', type=float, default=0.005)
+    parser.add_argument('--okx-error-rate', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--rate-limits', default=UNLIMITED_RATE_LIMITS,
+                        help='서버에 넘길 OKX_RATE_LIMITS (기본: 사실상 무제한, 서버 자체 처리량 측정용)')
+    args = parser.parse_args()
+
+    if args.url:
+        drive(args.url, args.warmup, args.concurrency, SYMBOLS)
+        print_report([(args.url, drive(args.url, args.requests, args.concurrency, SYMBOLS))])
+        return
+
+    fake, okx_url = start_server(latency=args.okx_latency, jitter=args.okx_jitter, error_rate=args.okx_error_rate)
+    print(f"🧪 가짜 OKX: {okx_url} (지연 {args.okx_latency * 1000:.0f}ms, 오류율 {args.okx_error_rate:.1%})")
+
+    env = dict(
+        os.environ,
+        OKX_BASE_URL=okx_url,
+        OKX_USE_PROXY='0',
+        OKX_API_KEY='bench', OKX_API_SECRET='bench', OKX_API_PASSPHRASE='bench',
+        WEBHOOK_TOKEN=BENCH_TOKEN,
+        OKX_RATE_LIMITS=args.rate_limits
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    rows = []
+    for config in args.configs.split(','):
+        command, extra_env = server_command(config, args.port, args.gunicorn_conf)
+        process = subprocess.Popen(command, env=dict(env, **extra_env),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_ready(url):
+                print(f"❌ {config}: 서버가 뜨지 않음")
+                continue
+            drive(url, args.warmup, args.concurrency, SYMBOLS)
+            result = drive(url, args.requests, args.concurrency, SYMBOLS)
+            print(f"✅ {config}: {result['rps']:.1f} req/s")
+            rows.append((config, result))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    print_report(rows)
+    fake.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 서킷 브레이커 설정
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', 30))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """서킷이 열려 있어서 요청을 보내지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """연속 실패가 쌓이면 열리는 서킷 브레이커
+
+    closed: 평소 상태, 연속 실패가 failures번이면 open으로.
+    open: reset초 동안 요청을 막고 바로 실패시킨다.
+    half_open: reset초가 지나면 시험 요청 하나만 통과시키고, 성공하면 closed,
+    실패하면 다시 open. 시험 요청 결과가 안 오면 reset초마다 하나씩 더 보낸다.
+    """
+
+    def __init__(self, name, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.name = name
+        self.failures = failures
+        self.reset = reset
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def available(self):
+        """상태를 바꾸지 않고 지금 요청을 보낼 수 있는지만 확인 (경로 목록 만들 때)"""
+        return self.state == CLOSED or time.monotonic() - self.opened_at >= self.reset
+
+    def allow(self):
+        """요청을 보내도 되는지 (open이면 False, 실제로 보내기 직전에만 부른다)"""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state != CLOSED and now - self.opened_at >= self.reset:
+                # 시험 요청 하나를 보내고 다음 시험까지 다시 reset초
+                self.state = HALF_OPEN
+                self.opened_at = now
+                logger.info(f"🟡 서킷 half-open: {self.name} (시험 요청)")
+                return True
+            if self.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """allow()로 차지한 시험 요청을 보내지 못했을 때 돌려준다 (다음 요청이 바로 시험하게)"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.opened_at = time.monotonic() - self.reset
+
+    def record(self, ok):
+        if ok and self.state == CLOSED and not self.consecutive_failures:
+            return
+        with self._lock:
+            if ok:
+                if self.state != CLOSED:
+                    logger.info(f"🟢 서킷 closed: {self.name}")
+                self.state = CLOSED
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failures:
+                if self.state != OPEN:
+                    logger.warning(f"🔴 서킷 open: {self.name} (연속 실패 {self.consecutive_failures}회, {self.reset:.0f}초 차단)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'rejected': self.rejected,
+            'open_for': round(time.monotonic() - self.opened_at, 1) if self.state != CLOSED else None
+        }
+
+
+class BreakerSet:
+    """이름(경로, 엔드포인트 그룹)별 서킷 브레이커 모음"""
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, self.failures, self.reset))
+        return breaker
+
+    def snapshot(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.to_dict() for breaker in breakers}
@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import threading
+
+import serializer
+
+logger = logging.getLogger(__name__)
+
+# 시계 동기화 설정
+CLOCK_SYNC_INTERVAL = float(os.getenv('CLOCK_SYNC_INTERVAL', 60))
+CLOCK_EWMA_ALPHA = 0.2
+# RTT가 튀어서 연속으로 이만큼 버리면 네트워크가 바뀐 것으로 보고 새 샘플로 다시 시작
+CLOCK_MAX_REJECTS = int(os.getenv('CLOCK_MAX_REJECTS', 3))
+
+# 타임스탬프 때문에 거절된 경우의 OKX 오류 코드
+# 50102: Timestamp request expired, 50112: Invalid OK-ACCESS-TIMESTAMP
+TIMESTAMP_ERROR_CODES = ('50102', '50112')
+
+
+def format_timestamp(seconds):
+    """OKX 서명용 ISO 타임스탬프 (2024-01-01T00:00:00.123Z)"""
+    millis = int(seconds * 1000)
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(millis // 1000)) + f'.{millis % 1000:03d}Z'
+
+
+class ClockSync:
+    """OKX 서버 시각과 로컬 시계의 차이(offset)를 추적
+
+    주기적으로 /api/v5/public/time을 조회해서 왕복시간(RTT)의 중간 시점 기준
+    offset을 구하고 EWMA로 평활한다. RTT가 평소보다 크게 튄 샘플은
+    오차가 크므로 offset에는 쓰지 않지만 RTT 추정에는 반영하고, 연속으로
+    CLOCK_MAX_REJECTS번 버리면 그 샘플로 다시 시작한다 (경로가 느려진 뒤에도
+    동기화가 멈추지 않도록). 서명에 쓰는 타임스탬프는 로컬 시각 + offset.
+    """
+
+    def __init__(self, base_url, fetch, interval=CLOCK_SYNC_INTERVAL):
+        self.base_url = base_url
+        self.fetch = fetch
+        self.interval = interval
+        self.offset = 0.0
+        self.rtt = None
+        self.synced_at = None
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='clock-sync', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(self.interval)
+
+    def sync(self, force=False):
+        """서버 시각을 한 번 조회해서 offset 갱신 (성공 여부 반환)"""
+        try:
+            started = time.time()
+            response = self.fetch('GET', f"{self.base_url}/api/v5/public/time", verify=False)
+            finished = time.time()
+            data = serializer.loads(response.content)
+            server_time = int(data['data'][0]['ts']) / 1000
+        except Exception as e:
+            logger.error(f"❌ 서버 시각 조회 실패: {e}")
+            return False
+
+        rtt = finished - started
+        offset = server_time - (started + finished) / 2
+        with self._lock:
+            if self.rtt is None or force or self.rejected >= CLOCK_MAX_REJECTS:
+                self.offset, self.rtt = offset, rtt
+            elif rtt > self.rtt * 3:
+                self.rejected += 1
+                self.rtt += CLOCK_EWMA_ALPHA * (rtt - self.rtt)
+                logger.warning(f"⚠️ 시각 샘플 버림 (RTT {rtt * 1000:.0f}ms, 연속 {self.rejected}회)")
+                return False
+            else:
+                self.offset += CLOCK_EWMA_ALPHA * (offset - self.offset)
+                self.rtt += CLOCK_EWMA_ALPHA * (rtt - self.rtt)
+            self.rejected = 0
+            self.synced_at = finished
+        logger.info(f"🕒 시계 동기화: offset {self.offset * 1000:+.1f}ms, RTT {self.rtt * 1000:.1f}ms")
+        return True
+
+    def now(self):
+        return time.time() + self.offset
+
+    def timestamp(self):
+        return format_timestamp(self.now())
+
+    def snapshot(self):
+        return {
+            'offset_ms': round(self.offset * 1000, 2),
+            'rtt_ms': round(self.rtt * 1000, 2) if self.rtt is not None else None,
+            'rejected': self.rejected,
+            'synced_at': self.synced_at
+        }
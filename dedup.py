@@ -0,0 +1,181 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 중복 신호 판별 설정
+DEDUP_BACKEND = os.getenv('DEDUP_BACKEND', 'memory')
+DEDUP_TTL = float(os.getenv('DEDUP_TTL', 300))
+# id 없는 신호(body 해시)는 재전송 판별에만 쓰고 짧게 기억한다 (같은 alert 본문이 진짜 신호로 또 올 수 있음)
+DEDUP_BODY_TTL = float(os.getenv('DEDUP_BODY_TTL', 10))
+DEDUP_MAX = int(os.getenv('DEDUP_MAX', 10000))
+DEDUP_DB = os.getenv('DEDUP_DB', 'dedup.sqlite3')
+
+
+def signal_key(webhook_data, raw):
+    """신호 id 필드가 있으면 그 값, 없으면 원본 body의 해시 (TradingView 재전송은 같은 bytes)
+
+    TradingView alert 본문은 매번 같을 수 있으므로 body 키는 DEDUP_BODY_TTL 동안만 유효하다.
+    신호마다 다른 값을 넣으려면 페이로드에 "id": "{{timenow}}" 같은 필드를 둔다.
+    """
+    if isinstance(webhook_data, dict):
+        for field in ('signal_id', 'id'):
+            if webhook_data.get(field):
+                return f"id:{webhook_data[field]}"
+    return 'body:' + hashlib.sha256(raw).hexdigest()
+
+
+def is_body_key(key):
+    return key.startswith('body:')
+
+
+def client_order_id(key):
+    """신호 키에서 항상 같은 OKX clOrdId(영숫자 32자)를 만든다"""
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+class MemoryDedup:
+    """워커 프로세스 안에서만 유효한 LRU + TTL 중복 신호 저장소"""
+
+    def __init__(self, ttl=DEDUP_TTL, max_size=DEDUP_MAX, body_ttl=DEDUP_BODY_TTL):
+        self.ttl = ttl
+        self.body_ttl = body_ttl
+        self.max_size = max_size
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def claim(self, key, signal_id):
+        """선점하면 (None, 쓸 signal_id), 처리 중이거나 끝난 키면 (이전 기록, None)
+
+        실패했던 키를 다시 선점하면 처음 기록한 signal_id를 돌려준다 (재전송이 같은
+        clOrdId로 나가서 첫 전송이 거래소에 닿았어도 중복 주문이 되지 않게).
+        """
+        now = time.time()
+        with self._lock:
+            record = self._records.get(key)
+            ttl = self.body_ttl if is_body_key(key) else self.ttl
+            if record is not None and now - record['created'] < ttl:
+                self._records.move_to_end(key)
+                if record['status'] != 'failed':
+                    self.duplicates += 1
+                    return dict(record), None
+                record['status'] = 'pending'
+                return None, record['signal_id']
+            self._records[key] = {'signal_id': signal_id, 'status': 'pending', 'result': None, 'created': now}
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+        return None, signal_id
+
+    def complete(self, key, result):
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                record.update(status='done', result=result)
+
+    def fail(self, key):
+        """실행이 실패한 신호는 재전송을 다시 받을 수 있게 실패로 표시 (signal_id는 남긴다)"""
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                record['status'] = 'failed'
+
+    def snapshot(self):
+        return {
+            'backend': 'memory', 'size': len(self._records), 'ttl': self.ttl, 'body_ttl': self.body_ttl,
+            'duplicates': self.duplicates
+        }
+
+
+class SqliteDedup:
+    """SQLite 파일에 기록해서 여러 워커 프로세스와 재시작 사이에도 유지되는 중복 신호 저장소"""
+
+    def __init__(self, path=DEDUP_DB, ttl=DEDUP_TTL, body_ttl=DEDUP_BODY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.body_ttl = body_ttl
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def _db(self):
+        """프로세스마다 따로 연결 (fork 전에 연 연결은 자식에서 쓰지 않는다)"""
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS dedup ('
+                'key TEXT PRIMARY KEY, signal_id TEXT, status TEXT, result TEXT, created REAL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS dedup_created ON dedup (created)')
+            self._pid = os.getpid()
+        return self._conn
+
+    def claim(self, key, signal_id):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                db.execute(
+                    "DELETE FROM dedup WHERE created < ? OR (key LIKE 'body:%' AND created < ?)",
+                    (now - self.ttl, now - self.body_ttl)
+                )
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO dedup VALUES (?, ?, 'pending', NULL, ?)", (key, signal_id, now)
+                )
+                row = None
+                if not cursor.rowcount:
+                    row = db.execute(
+                        'SELECT signal_id, status, result, created FROM dedup WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row[1] == 'failed':
+                        db.execute("UPDATE dedup SET status = 'pending' WHERE key = ?", (key,))
+                        signal_id, row = row[0], None
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None, signal_id
+        self.duplicates += 1
+        return {
+            'signal_id': row[0],
+            'status': row[1],
+            'result': json.loads(row[2]) if row[2] else None,
+            'created': row[3]
+        }, None
+
+    def complete(self, key, result):
+        with self._lock:
+            self._db().execute(
+                "UPDATE dedup SET status = 'done', result = ? WHERE key = ?", (json.dumps(result), key)
+            )
+
+    def fail(self, key):
+        with self._lock:
+            self._db().execute("UPDATE dedup SET status = 'failed' WHERE key = ?", (key,))
+
+    def snapshot(self):
+        with self._lock:
+            size = self._db().execute('SELECT COUNT(*) FROM dedup').fetchone()[0]
+        return {
+            'backend': 'sqlite', 'path': self.path, 'size': size, 'ttl': self.ttl, 'body_ttl': self.body_ttl,
+            'duplicates': self.duplicates
+        }
+
+
+def create_store(backend=DEDUP_BACKEND):
+    """DEDUP_BACKEND(memory|sqlite)에 맞는 저장소 생성"""
+    if backend == 'sqlite':
+        logger.info(f"🗄️ 중복 신호 저장소: SQLite ({DEDUP_DB})")
+        return SqliteDedup()
+    return MemoryDedup()
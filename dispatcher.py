@@ -0,0 +1,120 @@
+import os
+import queue
+import logging
+from collections import deque
+
+from pipeline import SignalQueue, signal_symbols, QueueFull, WEBHOOK_WORKERS, WEBHOOK_QUEUE_SIZE, SIGNAL_HISTORY
+
+logger = logging.getLogger(__name__)
+
+
+class LaneStats:
+    """심볼 하나의 대기열 깊이와 대기 시간"""
+
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        self.processed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+
+    def to_dict(self):
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'processed': self.processed,
+            'wait_avg': round(self.wait_total / self.processed, 4) if self.processed else None,
+            'wait_max': round(self.wait_max, 4),
+            'wait_last': round(self.wait_last, 4)
+        }
+
+
+class SymbolDispatcher(SignalQueue):
+    """심볼별 FIFO 대기열로 나눠서 실행하는 SignalQueue
+
+    같은 심볼 신호는 들어온 순서대로 하나씩 (매수 뒤 청산 순서 보장),
+    다른 심볼끼리는 워커 풀에서 동시에 실행한다. 대기 중이거나 실행 중인
+    심볼은 레인(deque)이 있고, 신호는 자기 심볼 레인 모두의 맨 앞에 왔을 때만
+    ready 큐에 들어가므로 순서가 섞이지 않는다. 배치 신호는 묶음의 심볼마다
+    레인에 들어가서 앞선 신호를 모두 기다리고, 끝날 때까지 뒤 신호를 막는다.
+    한 신호가 끝나면 다음 신호가 ready 큐 맨 뒤로 가서 바쁜 심볼이
+    워커를 독차지하지 않게 한다.
+
+    순서는 워커 프로세스 안에서만 보장되므로 gunicorn 워커가 여럿이면
+    같은 심볼 신호가 다른 프로세스로 갈 수 있다.
+    """
+
+    def __init__(self, handler, workers=WEBHOOK_WORKERS, max_depth=WEBHOOK_QUEUE_SIZE,
+                 history=SIGNAL_HISTORY):
+        super().__init__(handler, workers, max_depth, history)
+        self._lanes = {}
+        self._ready = queue.Queue()
+        self._lane_stats = {}
+        self._pending = 0
+
+    def submit(self, signal, signal_id=None):
+        """신호를 심볼 레인(배치는 심볼마다) 끝에 넣고 signal id를 반환"""
+        if self._pid != os.getpid():
+            self.start()
+        record = self._new_record(signal, signal_id)
+        entry = (record, signal, signal_symbols(record['symbol']))
+        with self._lock:
+            if self._pending >= self.max_depth:
+                self.rejected += 1
+                raise QueueFull(f"대기열 가득 참 ({self.max_depth})")
+            for symbol in entry[2]:
+                self._lanes.setdefault(symbol, deque()).append(entry)
+                stats = self._lane_stats.setdefault(symbol, LaneStats())
+                stats.depth += 1
+                stats.max_depth = max(stats.max_depth, stats.depth)
+            self._pending += 1
+            self._remember(record)
+            runnable = self._runnable(entry)
+        if runnable:
+            self._ready.put(entry)
+        return record['id']
+
+    def _runnable(self, entry):
+        """entry가 자기 심볼 레인 모두의 맨 앞인지 (self._lock 안에서)"""
+        return all(self._lanes[symbol][0] is entry for symbol in entry[2])
+
+    def snapshot(self):
+        """모니터링용 상태 (심볼별 깊이·대기 시간 포함)"""
+        with self._lock:
+            symbols = {key: stats.to_dict() for key, stats in self._lane_stats.items()}
+            depth = self._pending
+        return {
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'workers': self.workers,
+            'rejected': self.rejected,
+            'active_symbols': len(self._lanes),
+            'symbols': symbols
+        }
+
+    def _run(self):
+        while True:
+            entry = self._ready.get()
+            record, signal, symbols = entry
+            self._execute(record, signal)
+            ready = {}
+            with self._lock:
+                self._pending -= 1
+                wait = record['started_at'] - record['received_at']
+                for symbol in symbols:
+                    lane = self._lanes[symbol]
+                    lane.popleft()
+                    stats = self._lane_stats[symbol]
+                    stats.depth -= 1
+                    stats.processed += 1
+                    stats.wait_last = wait
+                    stats.wait_total += wait
+                    stats.wait_max = max(stats.wait_max, wait)
+                    if not lane:
+                        del self._lanes[symbol]
+                    elif self._runnable(lane[0]):
+                        # 배치는 여러 레인의 맨 앞이 되므로 한 번만 넣는다
+                        ready[lane[0][0]['id']] = lane[0]
+            for entry in ready.values():
+                self._ready.put(entry)
@@ -0,0 +1,185 @@
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 벤치마크용 로컬 OKX REST 대역 서버
+# OKX_BASE_URL=http://127.0.0.1:9000 으로 app.py를 띄우면 실제 거래소 대신 이 서버와 통신한다.
+# 지연시간(--latency, --jitter)과 오류(--error-rate)를 주입할 수 있다.
+
+INSTRUMENTS = {
+    'SWAP': [
+        {'instId': f'{coin}-USDT-SWAP', 'instType': 'SWAP', 'lotSz': lot, 'minSz': lot, 'tickSz': tick, 'ctVal': ct}
+        for coin, lot, tick, ct in [
+            ('BTC', '0.01', '0.1', '0.01'), ('ETH', '0.01', '0.01', '0.1'), ('SOL', '0.01', '0.001', '1'),
+            ('XRP', '1', '0.0001', '100'), ('DOGE', '1', '0.00001', '1000'), ('ADA', '1', '0.0001', '100')
+        ]
+    ],
+    'SPOT': [
+        {'instId': f'{coin}-USDT', 'instType': 'SPOT', 'lotSz': lot, 'minSz': lot, 'tickSz': tick, 'ctVal': ''}
+        for coin, lot, tick in [('BTC', '0.00000001', '0.1'), ('ETH', '0.000001', '0.01')]
+    ]
+}
+PRICES = {'BTC': '65000.1', 'ETH': '3200.55', 'SOL': '150.123', 'XRP': '0.5234', 'DOGE': '0.12345', 'ADA': '0.4567'}
+
+
+class FakeOKXState:
+    """주문에 따라 바뀌는 포지션과 주입 설정"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.positions = {}
+        self.orders = {}
+        self.order_seq = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def next_order_id(self):
+        with self.lock:
+            self.order_seq += 1
+            return str(self.order_seq)
+
+    def fill(self, order):
+        inst_id = order['instId']
+        pos_side = order.get('posSide') or 'net'
+        size = float(order['sz']) * (1 if order['side'] == 'buy' else -1)
+        with self.lock:
+            key = (inst_id, pos_side)
+            self.positions[key] = self.positions.get(key, 0.0) + size
+
+    def accept(self, order):
+        """주문을 체결하고 clOrdId로 조회할 수 있게 기억한 뒤 주문별 응답을 반환"""
+        self.fill(order)
+        leg = {'ordId': self.next_order_id(), 'clOrdId': order.get('clOrdId', ''), 'sCode': '0', 'sMsg': ''}
+        if leg['clOrdId']:
+            with self.lock:
+                self.orders[leg['clOrdId']] = dict(
+                    order, ordId=leg['ordId'], state='filled', accFillSz=order['sz']
+                )
+        return leg
+
+
+class FakeOKXHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        # 헤더와 본문을 한 번에 써서 Nagle/지연 ACK 대기를 피한다
+        self.wfile.write(head + body)
+
+    def _inject(self):
+        state = self.state
+        with state.lock:
+            state.requests += 1
+        delay = state.latency + random.uniform(-state.jitter, state.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if state.error_rate and random.random() < state.error_rate:
+            self._reply({'code': '50001', 'msg': 'Service temporarily unavailable', 'data': []}, 503)
+            return True
+        return False
+
+    def do_GET(self):
+        if self._inject():
+            return
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path
+
+        if path == '/api/v5/public/instruments':
+            data = INSTRUMENTS.get(query.get('instType', 'SWAP'), [])
+            if 'instId' in query:
+                data = [item for item in data if item['instId'] == query['instId']]
+            return self._reply({'code': '0', 'msg': '', 'data': data})
+        if path == '/api/v5/public/time':
+            return self._reply({'code': '0', 'msg': '', 'data': [{'ts': str(int(time.time() * 1000))}]})
+        if path == '/api/v5/market/ticker':
+            inst_id = query.get('instId', 'BTC-USDT-SWAP')
+            last = PRICES.get(inst_id.split('-')[0], '1')
+            return self._reply({'code': '0', 'msg': '', 'data': [{
+                'instId': inst_id, 'last': last, 'bidPx': last, 'askPx': last, 'ts': str(int(time.time() * 1000))
+            }]})
+        if path == '/api/v5/account/positions':
+            with self.state.lock:
+                positions = [
+                    {'instId': inst_id, 'posSide': pos_side, 'pos': str(size), 'mgnMode': 'isolated'}
+                    for (inst_id, pos_side), size in self.state.positions.items()
+                    if size and query.get('instId') in (None, inst_id)
+                ]
+            return self._reply({'code': '0', 'msg': '', 'data': positions})
+        if path == '/api/v5/account/balance':
+            return self._reply({'code': '0', 'msg': '', 'data': [{'totalEq': '100000', 'details': []}]})
+        if path == '/api/v5/trade/order':
+            with self.state.lock:
+                order = self.state.orders.get(query.get('clOrdId'))
+            if order is None:
+                return self._reply({'code': '51603', 'msg': 'Order does not exist', 'data': []})
+            return self._reply({'code': '0', 'msg': '', 'data': [order]})
+        self._reply({'code': '404', 'msg': f'unknown path {path}', 'data': []}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if self._inject():
+            return
+        path = urlsplit(self.path).path
+
+        if path == '/api/v5/trade/order':
+            return self._reply({'code': '0', 'msg': '', 'data': [self.state.accept(payload)]})
+        if path == '/api/v5/trade/batch-orders':
+            return self._reply({'code': '0', 'msg': '', 'data': [self.state.accept(order) for order in payload]})
+        if path == '/api/v5/trade/close-position':
+            ord_id = self.state.next_order_id()
+            with self.state.lock:
+                size = self.state.positions.pop((payload['instId'], payload.get('posSide') or 'net'), None)
+                if payload.get('clOrdId'):
+                    self.state.orders[payload['clOrdId']] = dict(
+                        payload, ordId=ord_id, state='filled', accFillSz=str(abs(size or 0))
+                    )
+            return self._reply({'code': '0', 'msg': '', 'data': [{
+                'instId': payload['instId'], 'posSide': payload.get('posSide', 'net'),
+                'clOrdId': payload.get('clOrdId', ''), 'tag': ''
+            }]})
+        self._reply({'code': '404', 'msg': f'unknown path {path}', 'data': []}, 404)
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+    """백그라운드 스레드에서 서버를 띄우고 (server, base_url)을 반환"""
+    state = FakeOKXState(latency, jitter, error_rate)
+    handler = type('Handler', (FakeOKXHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name='fake-okx', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='로컬 OKX REST 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', type=float, default=0.0, help='응답 지연 (초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='지연 흔들림 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율 (0~1)')
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"🧪 가짜 OKX 서버 실행 중: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,58 @@
+import os
+
+# gunicorn 워커 모델 프리셋
+#   GUNICORN_PROFILE=gthread gunicorn -c gunicorn.conf.py
+#
+# - sync    : 워커당 요청 하나 (느린 OKX 응답 동안 워커 전체가 멈춤)
+# - gthread : 워커당 스레드 GUNICORN_THREADS개 (기본, 로컬 벤치마크에서 가장 안정적)
+# - gevent  : 워커당 그린렛 GUNICORN_CONNECTIONS개 (gevent 설치 필요, preload 끔)
+# - uvicorn : ASGI 진입점(asgi:app)을 UvicornWorker로 실행
+#
+# preload(기본 켬)면 마스터에서 상품 정보 캐시를 한 번 채워 워커들이 물려받고,
+# 스레드·커넥션·웹소켓은 fork 이후 post_fork 훅에서 워커마다 새로 시작한다.
+
+PROFILE = os.getenv('GUNICORN_PROFILE', 'gthread')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# 기본 워커 1개: 메모리 중복 신호 저장소와 심볼별 FIFO 순서는 워커 프로세스 안에서만 유지된다
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+if workers > 1:
+    # 워커가 여럿이면 중복 신호는 프로세스끼리 나눠 쓰는 SQLite로 거른다 (따로 지정했으면 그대로)
+    os.environ.setdefault('DEDUP_BACKEND', 'sqlite')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 10
+keepalive = 5
+# gevent는 워커가 뜰 때 monkey patch하므로 그 전에 import된 모듈과 섞이지 않게 preload를 끈다
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1' and PROFILE != 'gevent'
+
+PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'wsgi_app': f"app:create_app(start={not preload_app})"
+    },
+    'gthread': {
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('GUNICORN_THREADS', 8)),
+        'wsgi_app': f"app:create_app(start={not preload_app})"
+    },
+    'gevent': {
+        'worker_class': 'gevent',
+        'worker_connections': int(os.getenv('GUNICORN_CONNECTIONS', 100)),
+        'wsgi_app': "app:create_app()"
+    },
+    'uvicorn': {
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'wsgi_app': "asgi:create_app()"
+    }
+}
+
+if PROFILE not in PROFILES:
+    raise ValueError(f"알 수 없는 GUNICORN_PROFILE: {PROFILE} ({', '.join(PROFILES)})")
+globals().update(PROFILES[PROFILE])
+
+
+def post_fork(server, worker):
+    """preload로 마스터에서 import된 앱이면 워커에서 트레이더(스레드·소켓)를 시작"""
+    if server.cfg.preload_app:
+        import app
+        app.get_trader()
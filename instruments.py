@@ -0,0 +1,159 @@
+import os
+import time
+import logging
+import threading
+
+import serializer
+from precision import InstrumentPrecision
+
+logger = logging.getLogger(__name__)
+
+# 캐시 설정
+INSTRUMENT_TTL = float(os.getenv('INSTRUMENT_TTL', 3600))
+INSTRUMENT_TYPES = tuple(
+    inst_type.strip().upper()
+    for inst_type in os.getenv('INSTRUMENT_TYPES', 'SWAP,SPOT').split(',')
+    if inst_type.strip()
+)
+
+
+def guess_inst_type(symbol):
+    """instId 모양으로 상품 종류 추정 (BTC-USDT-SWAP → SWAP, BTC-USDT → SPOT)"""
+    parts = symbol.upper().split('-')
+    if parts[-1] == 'SWAP':
+        return 'SWAP'
+    if len(parts) == 2:
+        return 'SPOT'
+    if len(parts) == 3 and parts[-1].isdigit():
+        return 'FUTURES'
+    return 'OPTION'
+
+
+def compile_precision(instruments):
+    """instId → InstrumentPrecision (규칙이 이상한 상품은 건너뛰고 주문할 때 다시 시도)"""
+    precision = {}
+    for item in instruments:
+        try:
+            precision[item['instId']] = InstrumentPrecision.from_info(item)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"⚠️ 상품 규칙 해석 실패: {item.get('instId')} {e}")
+    return precision
+
+
+class InstrumentRegistry:
+    """OKX 상품 정보(lotSz, minSz 등) 메모리 캐시
+
+    시작할 때 상품 종류별로 한 번씩 전체 목록을 받아 두고, TTL마다
+    백그라운드에서 갱신한다. 갱신이 실패하면 이전 데이터를 그대로 쓴다.
+    캐시에 없는 심볼만 단건 조회하고, 그것도 실패하면 None을 돌려준다.
+    캐시에 넣을 때 상품마다 수량·가격 규칙(InstrumentPrecision)도 미리 만들어 둔다.
+    """
+
+    def __init__(self, base_url, fetch, inst_types=INSTRUMENT_TYPES, ttl=INSTRUMENT_TTL):
+        self.base_url = base_url
+        self.fetch = fetch
+        self.inst_types = inst_types
+        self.ttl = ttl
+        self._instruments = {}
+        self._precision = {}
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작 (첫 주기에 바로 전체 로드)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='instrument-registry', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # fork 전에 채워 둔 캐시가 아직 유효하면 남은 TTL만큼 기다렸다가 갱신
+        self._stop.wait(self.remaining())
+        while not self._stop.is_set():
+            self.load()
+            self._stop.wait(self.ttl)
+
+    def remaining(self):
+        """모든 상품 종류가 로드돼 있으면 가장 오래된 것의 남은 TTL(초), 아니면 0"""
+        if any(inst_type not in self._loaded_at for inst_type in self.inst_types):
+            return 0
+        return max(0, min(self._loaded_at.values()) + self.ttl - time.time())
+
+    def load(self, fetch=None):
+        """설정된 상품 종류 전체를 종류별 한 번의 요청으로 로드 (fetch: 이번만 쓸 요청 함수)"""
+        for inst_type in self.inst_types:
+            try:
+                instruments = self._request(inst_type, fetch=fetch)
+            except Exception as e:
+                logger.error(f"❌ 상품 정보 갱신 실패 ({inst_type}), 기존 캐시 유지: {e}")
+                continue
+            precision = compile_precision(instruments)
+            with self._lock:
+                self._instruments.update({item['instId']: item for item in instruments})
+                self._precision.update(precision)
+                self._loaded_at[inst_type] = time.time()
+            logger.info(f"📚 상품 정보 로드: {inst_type} {len(instruments)}개")
+
+    def _request(self, inst_type, symbol=None, fetch=None):
+        url = f"{self.base_url}/api/v5/public/instruments?instType={inst_type}"
+        if symbol:
+            url += f"&instId={symbol}"
+        response = (fetch or self.fetch)('GET', url, verify=False)
+        data = serializer.loads(response.content)
+        if data.get('code') != '0':
+            raise ValueError(f"OKX 오류 {data.get('code')}: {data.get('msg')}")
+        return data.get('data', [])
+
+    def cached(self, symbol):
+        """네트워크 없이 캐시에 있는 정보만 조회"""
+        return self._instruments.get(symbol)
+
+    def get(self, symbol):
+        """캐시에서 상품 정보 조회 (없으면 단건 조회, 실패시 None)"""
+        if self._pid != os.getpid():
+            self.start()
+        info = self._instruments.get(symbol)
+        if info is not None:
+            return info
+
+        try:
+            instruments = self._request(guess_inst_type(symbol), symbol)
+        except Exception as e:
+            logger.error(f"❌ 심볼 정보 조회 오류: {symbol} {e}")
+            return None
+        if not instruments:
+            logger.warning(f"⚠️ 존재하지 않는 심볼: {symbol}")
+            return None
+        precision = compile_precision(instruments[:1])
+        with self._lock:
+            self._instruments[symbol] = instruments[0]
+            self._precision.update(precision)
+        return instruments[0]
+
+    def precision(self, info):
+        """상품 정보의 미리 계산된 수량·가격 규칙 (캐시 밖에서 온 정보면 새로 만든다)"""
+        precision = self._precision.get(info['instId'])
+        if precision is None:
+            precision = InstrumentPrecision.from_info(info)
+        return precision
+
+    def snapshot(self):
+        """모니터링용 상태"""
+        now = time.time()
+        return {
+            'count': len(self._instruments),
+            'age': {
+                inst_type: round(now - loaded_at, 1)
+                for inst_type, loaded_at in self._loaded_at.items()
+            },
+            'ttl': self.ttl
+        }
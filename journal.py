@@ -0,0 +1,257 @@
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+
+import serializer
+from logs import correlation_id
+
+logger = logging.getLogger(__name__)
+
+# 주문 장부 설정
+JOURNAL_ENABLED = os.getenv('JOURNAL_ENABLED', '1') == '1'
+JOURNAL_DB = os.getenv('JOURNAL_DB', 'journal.sqlite3')
+# 한 번의 커밋(fsync)에 묶어 쓰는 최대 기록 수
+JOURNAL_BATCH = int(os.getenv('JOURNAL_BATCH', 500))
+# 시작 후 이 시간(초)을 기다렸다가 복구 (다른 워커가 보내는 중인 주문의 ack를 기다림)
+JOURNAL_RECOVERY_GRACE = float(os.getenv('JOURNAL_RECOVERY_GRACE', 15))
+# 이보다 오래된 미확인 주문은 거래소에서 조회하지 않는다 (초)
+JOURNAL_RECOVERY_WINDOW = float(os.getenv('JOURNAL_RECOVERY_WINDOW', 86400))
+# 주문 기록이 커밋될 때까지 전송을 붙잡아 두는 최대 시간(초)
+JOURNAL_SYNC_TIMEOUT = float(os.getenv('JOURNAL_SYNC_TIMEOUT', 1))
+
+# 기록 종류
+SIGNAL = 'signal'
+ORDER = 'order'
+ACK = 'ack'
+ERROR = 'error'
+RECONCILED = 'reconciled'
+
+COLUMNS = 'ts, pid, kind, cid, signal_id, cl_ord_id, inst_id, payload'
+
+
+class OrderJournal:
+    """신호, 나가는 주문(clOrdId), 거래소 ack를 남기는 추가 전용 로컬 장부 (SQLite WAL)
+
+    요청 경로는 기록을 큐에 넣기만 하고, 워커 프로세스마다 하나인 기록 스레드가
+    쌓인 기록을 한 트랜잭션으로 묶어 커밋한다 (그룹 커밋, synchronous=FULL이라
+    커밋마다 fsync). fsync 중에 들어온 기록은 다음 커밋에 함께 들어간다.
+    나가는 주문은 자기 묶음이 커밋될 때까지 기다렸다가 보내므로 워커가 전송 중에
+    죽어도 남는다. 신호와 ack는 기다리지 않으므로 커밋 전 마지막 묶음에 있던 것만 잃는다.
+
+    시작할 때 recover()가 ack 없이 끝난 주문을 clOrdId로 OKX에 조회해서
+    접수 여부를 장부에 남긴다. 주문을 다시 보내지는 않는다.
+    """
+
+    def __init__(self, path=JOURNAL_DB, enabled=JOURNAL_ENABLED, batch=JOURNAL_BATCH):
+        self.path = path
+        self.enabled = enabled
+        self.batch = batch
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._pid = None
+        self._recovered_pid = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.commits = 0
+        self.commit_total = 0.0
+        self.commit_max = 0.0
+        self.errors = 0
+        self.recovery = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=FULL')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'ts REAL, pid INTEGER, kind TEXT, cid TEXT, signal_id TEXT, cl_ord_id TEXT, inst_id TEXT, payload BLOB)'
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS journal_cl_ord_id ON journal (cl_ord_id)')
+        return db
+
+    def start(self):
+        """기록 스레드 시작 (fork 이후 워커에서는 처음 기록할 때 새로 띄운다)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name='order-journal', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """큐에 남은 기록을 커밋하고 기록 스레드 종료"""
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._pid = None
+
+    def append(self, kind, signal_id=None, cl_ord_id=None, inst_id=None, payload=None):
+        """기록 하나를 큐에 넣는다 (커밋은 기록 스레드가)"""
+        if not self.enabled:
+            return
+        if self._pid != os.getpid():
+            self.start()
+        self._queue.put((
+            time.time(), os.getpid(), kind, correlation_id.get(), signal_id, cl_ord_id, inst_id,
+            serializer.dumps(payload) if payload is not None else None
+        ))
+
+    def signal(self, parsed_data):
+        """검증을 통과하고 선점한 신호 (토큰은 빼고)"""
+        payload = {key: value for key, value in parsed_data.items() if key != 'token'}
+        self.append(SIGNAL, parsed_data.get('signal_id'), payload=payload)
+
+    def orders(self, bodies):
+        """거래소로 보내기 직전의 주문들 (커밋될 때까지 기다린다)"""
+        for body in bodies:
+            self.append(ORDER, cl_ord_id=body.get('clOrdId'), inst_id=body.get('instId'), payload=body)
+        self.sync()
+
+    def sync(self, timeout=JOURNAL_SYNC_TIMEOUT):
+        """지금까지 넣은 기록이 커밋될 때까지 대기 (같은 묶음의 다른 기록과 커밋 한 번을 나눠 쓴다)"""
+        if not self.enabled or self._pid != os.getpid():
+            return
+        committed = threading.Event()
+        self._queue.put(committed)
+        if not committed.wait(timeout):
+            logger.warning(f"⚠️ 주문 장부 커밋 대기 시간 초과 ({timeout}s), 기록 전에 전송")
+
+    def acks(self, bodies, result):
+        """주문별 거래소 응답 (sCode, ordId)"""
+        legs = result.get('data') or []
+        for i, body in enumerate(bodies):
+            leg = legs[i] if i < len(legs) else {'sCode': result.get('code'), 'sMsg': result.get('msg')}
+            self.append(ACK, cl_ord_id=body.get('clOrdId'), inst_id=body.get('instId'), payload=leg)
+
+    def failed(self, bodies, error):
+        """응답을 못 받은 전송 (접수 여부를 모르므로 ack로 치지 않는다)"""
+        for body in bodies:
+            self.append(ERROR, cl_ord_id=body.get('clOrdId'), inst_id=body.get('instId'),
+                        payload={'error': f"{type(error).__name__}: {error}"})
+
+    def _run(self, entries):
+        try:
+            db = self._connect()
+        except Exception as e:
+            logger.error(f"❌ 주문 장부를 열 수 없음 ({self.path}): {e}")
+            self.enabled = False
+            return
+        while True:
+            rows = [entries.get()]
+            # 앞 커밋(fsync) 동안 쌓인 기록을 한 번에 가져온다
+            while len(rows) < self.batch:
+                try:
+                    rows.append(entries.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in rows
+            waiters = [row for row in rows if isinstance(row, threading.Event)]
+            rows = [row for row in rows if isinstance(row, tuple)]
+            if rows:
+                self._commit(db, rows)
+            # 커밋이 실패해도 전송을 막지는 않는다 (실패는 errors와 로그로 남는다)
+            for committed in waiters:
+                committed.set()
+            if stopping:
+                db.close()
+                return
+
+    def _commit(self, db, rows):
+        started = time.perf_counter()
+        try:
+            db.execute('BEGIN')
+            db.executemany(f'INSERT INTO journal ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            db.execute('COMMIT')
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ 주문 장부 기록 실패 ({len(rows)}건): {e}")
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            return
+        elapsed = time.perf_counter() - started
+        self.written += len(rows)
+        self.commits += 1
+        self.commit_total += elapsed
+        self.commit_max = max(self.commit_max, elapsed)
+
+    def unacked(self, before, window=JOURNAL_RECOVERY_WINDOW):
+        """before 이전에 보냈는데 ack도 복구 기록도 없는 clOrdId 주문들
+
+        pid로 거르지 않는다 (컨테이너가 다시 뜨면 새 워커가 죽은 워커와 같은 pid를 받는다).
+        before는 이 워커가 시작한 시각이라 이 워커가 보낸 주문은 들어오지 않는다.
+        """
+        db = self._connect()
+        try:
+            return db.execute(
+                'SELECT o.cl_ord_id, o.inst_id, o.ts, o.pid FROM journal o '
+                'WHERE o.kind = ? AND o.cl_ord_id IS NOT NULL AND o.ts < ? AND o.ts > ? '
+                'AND NOT EXISTS (SELECT 1 FROM journal a WHERE a.cl_ord_id = o.cl_ord_id AND a.kind IN (?, ?)) '
+                'GROUP BY o.cl_ord_id ORDER BY o.ts',
+                (ORDER, before, before - window, ACK, RECONCILED)
+            ).fetchall()
+        finally:
+            db.close()
+
+    def recover(self, lookup, grace=JOURNAL_RECOVERY_GRACE):
+        """응답 전에 워커가 죽어서 ack가 없는 주문을 OKX에 조회해 장부에 맞춘다
+
+        lookup(inst_id, cl_ord_id)는 주문 dict나 None(접수 안 됨)을 돌려주고 조회에 실패하면 예외를 던진다.
+        워커마다 시작할 때 한 번, 백그라운드 스레드에서 실행한다.
+        """
+        if not self.enabled or self._recovered_pid == os.getpid():
+            return
+        self._recovered_pid = os.getpid()
+        started = time.time()
+
+        def run():
+            time.sleep(grace)
+            try:
+                orders = self.unacked(started)
+            except Exception as e:
+                logger.error(f"❌ 주문 장부 복구 조회 실패: {e}")
+                return
+            found = missing = failed = 0
+            for cl_ord_id, inst_id, ts, pid in orders:
+                try:
+                    order = lookup(inst_id, cl_ord_id)
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"❌ 미확인 주문 조회 실패: {cl_ord_id} ({e})")
+                    continue
+                if order is None:
+                    missing += 1
+                    logger.warning(f"⚠️ 미확인 주문이 거래소에 없음 (접수 안 됨): {inst_id} {cl_ord_id}")
+                    payload = {'state': 'missing'}
+                else:
+                    found += 1
+                    logger.warning(f"⚠️ 응답을 못 받은 주문이 접수돼 있음: {inst_id} {cl_ord_id} → {order.get('ordId')} ({order.get('state')})")
+                    payload = {'state': order.get('state'), 'ordId': order.get('ordId'), 'fillSz': order.get('accFillSz')}
+                self.append(RECONCILED, cl_ord_id=cl_ord_id, inst_id=inst_id, payload=payload)
+            self.recovery = {'checked': len(orders), 'found': found, 'missing': missing, 'failed': failed}
+            if orders:
+                logger.info(f"📒 주문 장부 복구: 미확인 {len(orders)}건 (접수 {found}, 없음 {missing}, 실패 {failed})")
+
+        threading.Thread(target=run, name='journal-recovery', daemon=True).start()
+
+    def snapshot(self):
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'path': self.path,
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'commits': self.commits,
+            'batch_avg': round(self.written / self.commits, 1) if self.commits else None,
+            'commit_avg_ms': round(self.commit_total / self.commits * 1000, 3) if self.commits else None,
+            'commit_max_ms': round(self.commit_max * 1000, 3),
+            'errors': self.errors,
+            'recovery': self.recovery
+        }
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# 로깅 설정
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+# 자세한 응답 로그는 이벤트별로 N번에 한 번만 남김 (예: webhook_payload=10,positions=20)
+LOG_SAMPLE_EVERY = os.getenv('LOG_SAMPLE_EVERY', 'webhook_payload=10,positions=10,order_result=1')
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(correlation_id)s] %(message)s'
+
+# 웹훅 하나를 처리하는 동안의 상관관계 id (대기열 워커, fan-out 스레드로도 넘겨준다)
+correlation_id = contextvars.ContextVar('correlation_id', default='-')
+
+# LogRecord 기본 속성 (이 밖의 extra 필드만 JSON에 싣는다)
+RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'correlation_id'}
+
+
+def parse_sample_every(value):
+    every = {}
+    for item in (value or '').split(','):
+        name, _, n = item.partition('=')
+        if name.strip() and n.strip():
+            every[name.strip()] = max(1, int(n))
+    return every
+
+
+class CorrelationFilter(logging.Filter):
+    """로그를 남기는 스레드에서 현재 상관관계 id를 레코드에 붙인다"""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 이벤트 하나인 JSON 로그 (extra로 넘긴 필드 포함)"""
+
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'cid': getattr(record, 'correlation_id', '-'),
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED and not key.startswith('_'):
+                event[key] = value
+        if record.exc_info:
+            event['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            event['exc'] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class ProcessQueueHandler(QueueHandler):
+    """워커 프로세스마다 리스너 스레드를 띄워 두고 레코드를 큐에만 넣는 핸들러
+
+    포맷과 쓰기는 리스너 스레드가 하므로 요청 경로는 큐에 넣는 비용만 든다.
+    fork 이후 워커에는 리스너 스레드가 없으므로 처음 기록할 때 다시 띄운다.
+    """
+
+    def __init__(self, target):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self._pid = None
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        super().emit(record)
+
+    def prepare(self, record):
+        # 기본 prepare는 여기서 메시지를 포맷하지만 리스너 쪽 포매터가 하도록 미룬다
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class Sampler:
+    """이벤트 이름별로 N번에 한 번만 True (자세한 응답 로그 줄이기용)"""
+
+    def __init__(self, every=None):
+        self.every = parse_sample_every(LOG_SAMPLE_EVERY) if every is None else every
+        self._counts = {}
+
+    def sample(self, event):
+        every = self.every.get(event, 1)
+        if every == 1:
+            return True
+        count = self._counts.get(event, 0)
+        self._counts[event] = count + 1
+        return count % every == 0
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """루트 로거를 큐 핸들러 하나로 바꾸고 (json|text) 포맷의 스트림 출력은 리스너 스레드로"""
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+    handler = ProcessQueueHandler(target)
+    handler.addFilter(CorrelationFilter())
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+        if isinstance(old, ProcessQueueHandler):
+            old.stop()
+    root.addHandler(handler)
+    root.setLevel(level)
+    handler.start()
+    # 종료할 때 큐에 남은 로그를 마저 쓴다
+    atexit.register(handler.stop)
+    return handler
+
+
+sampler = Sampler()
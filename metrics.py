@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# 히스토그램 설정
+METRICS_WINDOW = int(os.getenv('METRICS_WINDOW', 1024))
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 현재 처리 중인 심볼 (타이머가 라벨로 사용)
+current_symbol = contextvars.ContextVar('current_symbol', default='')
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """고정 버킷 누적 카운트 + 최근 METRICS_WINDOW개 샘플 (분위수 계산용)"""
+
+    def __init__(self, buckets=BUCKETS, window=METRICS_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self, quantiles=QUANTILES):
+        samples = sorted(self.samples)
+        if not samples:
+            return {q: 0.0 for q in quantiles}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles}
+
+
+class StageMetrics:
+    """웹훅 → 거래소 응답 경로의 단계별 소요 시간 (stage, symbol 라벨)
+
+    값은 워커 프로세스별로 집계된다. render()는 Prometheus 텍스트 형식으로
+    단계·심볼별 히스토그램과 최근 샘플 기준 p50/p95/p99 요약을 내보낸다.
+    """
+
+    def __init__(self, name='webhook_stage_seconds'):
+        self.name = name
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, symbol=None):
+        if symbol is None:
+            symbol = current_symbol.get()
+        key = (stage, symbol)
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage, symbol=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, symbol)
+
+    @contextmanager
+    def symbol(self, symbol):
+        """블록 안에서 기록되는 값에 심볼 라벨을 붙임"""
+        token = current_symbol.set(symbol)
+        try:
+            yield
+        finally:
+            current_symbol.reset(token)
+
+    def snapshot(self):
+        """단계·심볼별 (count, p50, p95, p99)"""
+        with self._lock:
+            series = list(self._series.items())
+        return {
+            f"{stage}/{symbol}" if symbol else stage: {
+                'count': histogram.count,
+                **{f"p{int(q * 100)}": round(v, 6) for q, v in histogram.quantiles().items()}
+            }
+            for (stage, symbol), histogram in series
+        }
+
+    def render(self):
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = [
+                f"# HELP {self.name} Webhook to exchange ack latency per stage",
+                f"# TYPE {self.name} histogram"
+            ]
+            for (stage, symbol), histogram in series:
+                labels = f'stage="{escape_label(stage)}",symbol="{escape_label(symbol)}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{self.name}_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{self.name}_count{{{labels}}} {histogram.count}')
+
+            summary = f"{self.name}_recent"
+            lines.append(f"# HELP {summary} Quantiles over the most recent {METRICS_WINDOW} samples")
+            lines.append(f"# TYPE {summary} summary")
+            for (stage, symbol), histogram in series:
+                labels = f'stage="{escape_label(stage)}",symbol="{escape_label(symbol)}"'
+                for q, value in histogram.quantiles().items():
+                    lines.append(f'{summary}{{{labels},quantile="{q}"}} {value}')
+                lines.append(f'{summary}_sum{{{labels}}} {sum(histogram.samples)}')
+                lines.append(f'{summary}_count{{{labels}}} {len(histogram.samples)}')
+        return '\n'.join(lines) + '\n'
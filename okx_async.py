@@ -0,0 +1,325 @@
+import serializer
+import time
+import asyncio
+import logging
+
+import httpx
+
+from app import get_trader, rate_limiter, stage_metrics, route_racer, endpoint_breaker, order_journal
+from breaker import CircuitOpen
+from logs import sampler
+from racer import route_name, has_client_order_id, check, is_signed, REQUEST_TIMEOUT, ORDER_CONNECT_TIMEOUT
+from transport import HTTP_POOL_SIZE, HTTP_MAX_IDLE, DIRECT_ROUTE
+from ws_private import WS_ORDER_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTransport:
+    """경로(직접 연결, 프록시별)마다 httpx.AsyncClient 하나씩 두고 공유하는 전송 계층"""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, max_idle=HTTP_MAX_IDLE, timeout=15):
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=max_idle
+        )
+        self.timeout = timeout
+        self._clients = {}
+
+    def client_for(self, proxies=None):
+        name = proxies['https'] if proxies else DIRECT_ROUTE
+        client = self._clients.get(name)
+        if client is None:
+            client = httpx.AsyncClient(
+                proxy=proxies['https'] if proxies else None,
+                limits=self.limits,
+                timeout=self.timeout,
+                verify=False
+            )
+            self._clients[name] = client
+        return client
+
+    async def request(self, method, url, proxies=None, **kwargs):
+        return await self.client_for(proxies).request(method.upper(), url, **kwargs)
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+# 이 예외들은 연결 단계 실패라 주문이 나가지 않았으므로 다른 경로로 다시 보내도 안전
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ProxyError, CircuitOpen)
+
+
+async def send_route(transport, proxies, method, url, kwargs):
+    """경로 하나로 보내고 (응답, 정상 여부)를 반환"""
+    route_racer.admit(proxies)
+    started = time.monotonic()
+    try:
+        with stage_metrics.time('http'):
+            response = await transport.request(method, url, proxies=proxies, **kwargs)
+    except Exception:
+        route_racer.report(proxies, False)
+        raise
+    ok, healthy = check(response)
+    route_racer.report(proxies, healthy, time.monotonic() - started)
+    return response, ok
+
+
+async def make_request_async(transport, method, url, **kwargs):
+    """make_request_with_proxy의 비동기 버전 (조회는 상위 경로끼리 경쟁, 주문은 빠른 전환)"""
+    breaker, trial = endpoint_breaker(url)
+    wait = rate_limiter.reserve(url)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    try:
+        response = await race_routes(transport, method, url, kwargs)
+    except CircuitOpen:
+        # 경로가 막혀서 보내지 못했으면 엔드포인트의 시험 요청 자리를 돌려준다
+        if trial:
+            breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(response.status_code < 500)
+    return response
+
+
+async def race_routes(transport, method, url, kwargs):
+    """RouteRacer.request의 비동기판 (서명 없는 조회는 경쟁, 나머지는 경로를 하나씩)"""
+    with stage_metrics.time('proxy'):
+        routes = route_racer.routes()
+    if method.upper() == 'GET' and len(routes) > 1 and not is_signed(kwargs):
+        route_racer.races += 1
+        tasks = {
+            asyncio.ensure_future(send_route(transport, proxies, method, url, kwargs)): proxies
+            for proxies in routes[:route_racer.width]
+        }
+        error = bad = None
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                proxies = tasks.pop(task)
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                response, ok = task.result()
+                if not ok:
+                    # 차단 페이지나 오류 응답은 이기지 못하고 나머지 경로를 계속 기다린다
+                    bad = response
+                    continue
+                # 진 경로는 끝까지 돌게 두고 예외만 조용히 회수
+                for loser in tasks:
+                    loser.add_done_callback(lambda t: t.cancelled() or t.exception())
+                route_racer.record_win(route_name(proxies))
+                return response
+        routes = routes[route_racer.width:]
+        if not routes:
+            if bad is not None:
+                return bad
+            raise error
+    elif method.upper() != 'GET':
+        kwargs.setdefault('timeout', httpx.Timeout(REQUEST_TIMEOUT, connect=ORDER_CONNECT_TIMEOUT))
+
+    for i, proxies in enumerate(routes):
+        last = i == len(routes) - 1
+        try:
+            response, ok = await send_route(transport, proxies, method, url, kwargs)
+        except Exception as e:
+            resend = method.upper() == 'GET' or isinstance(e, UNSENT_ERRORS) or has_client_order_id(kwargs.get('content'))
+            if last or not resend:
+                logger.error(f"❌ 요청 실패 ({route_name(proxies)}): {e}")
+                raise
+            route_racer.failovers += 1
+            logger.warning(f"⚠️ {route_name(proxies)} 경로 실패, 다음 경로로: {e}")
+            continue
+        # 오류 응답은 다시 보내도 안전할 때만 다음 경로로 (마지막 경로면 그대로 돌려준다)
+        if not ok and not last and (method.upper() == 'GET' or has_client_order_id(kwargs.get('content'))):
+            route_racer.failovers += 1
+            logger.warning(f"⚠️ {route_name(proxies)} 경로 오류 응답({response.status_code}), 다음 경로로")
+            continue
+        if ok:
+            route_racer.record_win(route_name(proxies))
+        return response
+
+
+class AsyncOKXTrader:
+    """OKXTrader와 같은 메서드 이름을 가진 asyncio 버전
+
+    설정, 서명, 상품 정보 캐시는 워커의 OKXTrader를 그대로 쓰고
+    네트워크 I/O만 공유 AsyncTransport로 보낸다.
+    """
+
+    def __init__(self, trader=None, transport=None):
+        self._trader = trader
+        self.transport = transport or AsyncTransport()
+
+    @property
+    def trader(self):
+        """지정한 트레이더가 없으면 매번 워커의 현재 OKXTrader (/reload 후에도 새 설정·연결을 씀)"""
+        return self._trader or get_trader()
+
+    @property
+    def base_url(self):
+        return self.trader.base_url
+
+    async def _get_json(self, path, signed=False):
+        headers = self.trader.sign_request('GET', path) if signed else None
+        response = await make_request_async(self.transport, 'GET', self.base_url + path, headers=headers)
+        return serializer.loads(response.content)
+
+    async def get_instrument_info(self, symbol):
+        info = self.trader.instruments.cached(symbol)
+        if info is None:
+            # 캐시에 없을 때만 스레드에서 단건 조회
+            info = await asyncio.to_thread(self.trader.instruments.get, symbol)
+        return info
+
+    async def get_ticker(self, symbol):
+        """현재가 조회 (웹소켓 시세가 최신이면 메모리에서, 아니면 REST)"""
+        market_data = self.trader.market_data
+        if market_data is not None:
+            tick = market_data.ticker(symbol)
+            if tick is not None:
+                return tick.last
+            market_data.watch(symbol)
+        try:
+            data = await self._get_json(f"/api/v5/market/ticker?instId={symbol}")
+            if data['code'] == '0' and data.get('data'):
+                return float(data['data'][0]['last'])
+            return None
+        except Exception as e:
+            logger.error(f"❌ 가격 조회 오류: {e}")
+            return None
+
+    async def get_positions(self, symbol=None):
+        """포지션 조회"""
+        path = "/api/v5/account/positions"
+        if symbol:
+            path += f"?instId={symbol}"
+        try:
+            return await self._get_json(path, signed=True)
+        except Exception as e:
+            logger.error(f"❌ 포지션 조회 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    async def get_balance(self):
+        """잔고 조회"""
+        try:
+            return await self._get_json("/api/v5/account/balance", signed=True)
+        except Exception as e:
+            logger.error(f"❌ 잔고 조회 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    async def post(self, path, body):
+        """서명된 POST 요청을 보내고 JSON 응답을 반환"""
+        body_bytes = serializer.dumps(body)
+        headers = self.trader.sign_request('POST', path, body_bytes)
+        response = await make_request_async(
+            self.transport, 'POST', self.base_url + path, headers=headers, content=body_bytes
+        )
+        return serializer.loads(response.content)
+
+    async def submit_orders(self, op, path, bodies):
+        """OKXTrader.submit_orders의 비동기판 (웹소켓 ack는 Future를 await)"""
+        trader = self.trader
+        trader.assign_client_ids(bodies)
+        # 주문 장부 커밋(fsync)을 기다리는 동안 이벤트 루프를 막지 않는다
+        await asyncio.to_thread(order_journal.orders, bodies)
+        stream = trader.private_stream
+        if trader.exec_mode == 'ws' and stream is not None and stream.ready:
+            future = None
+            try:
+                future = stream.request_future(op, bodies)
+                with stage_metrics.time('ws_order'):
+                    result = await asyncio.wait_for(asyncio.wrap_future(future), WS_ORDER_TIMEOUT)
+                trader.record_acks(bodies, result)
+                return result
+            except Exception as e:
+                logger.warning(f"⚠️ 웹소켓 주문 실패, REST로 재전송: {type(e).__name__} {e}")
+            finally:
+                if future is not None:
+                    stream.discard(future)
+        try:
+            result = await self.post(path, bodies[0] if op == 'order' else bodies)
+        except Exception as e:
+            order_journal.failed(bodies, e)
+            raise
+        if trader.duplicated_legs(result):
+            result = await asyncio.to_thread(trader.resolve_duplicates, bodies, result)
+        trader.record_acks(bodies, result)
+        return result
+
+    async def close_position(self, symbol, side):
+        """포지션 청산 (포지션별 close-position 요청을 동시에 전송)"""
+        positions = await self.get_positions(symbol)
+        if positions['code'] != '0':
+            return positions
+
+        targets = [
+            pos for pos in positions.get('data', [])
+            if pos['instId'] == symbol and float(pos['pos']) != 0
+        ]
+        if not targets:
+            return {"code": "0", "msg": "청산할 포지션이 없습니다"}
+        closed_orders = await asyncio.gather(*(self.close_one(pos) for pos in targets))
+        return {"code": "0", "data": list(closed_orders)}
+
+    async def close_one(self, pos):
+        """포지션 하나 청산"""
+        body = self.trader.close_body(pos)
+        await asyncio.to_thread(order_journal.orders, [body])
+        try:
+            try:
+                result = await self.post("/api/v5/trade/close-position", body)
+            except Exception as e:
+                order_journal.failed([body], e)
+                raise
+            self.trader.record_acks([body], result)
+            return result
+        except Exception as e:
+            logger.error(f"❌ 청산 실행 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    async def place_order(self, symbol, side, amount, price=None, order_type="market", td_mode=None, cl_ord_id=None):
+        """주문 실행"""
+        body, error = self.trader.build_order(
+            await self.get_instrument_info(symbol), symbol, side, amount, price, order_type, td_mode, cl_ord_id
+        )
+        if error:
+            return error
+
+        try:
+            result = await self.submit_orders('order', "/api/v5/trade/order", [body])
+            if result.get('code') != '0':
+                logger.error("❌ 주문 실패", extra={'event': 'order_result', 'result': result})
+            elif sampler.sample('order_result'):
+                logger.info("✅ 주문 성공!", extra={'event': 'order_result', 'result': result})
+            return result
+        except Exception as e:
+            logger.error(f"❌ 주문 실행 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    async def send_batch(self, bodies):
+        try:
+            return await self.submit_orders('batch-orders', "/api/v5/trade/batch-orders", bodies)
+        except Exception as e:
+            logger.error(f"❌ 배치 주문 전송 오류: {e}")
+            return {"code": "error", "msg": str(e)}
+
+    async def place_batch_orders(self, orders):
+        """여러 주문을 batch-orders로 20개씩 묶어 동시에 전송하고 주문별 결과를 반환"""
+        infos = await asyncio.gather(*(self.get_instrument_info(order['symbol']) for order in orders))
+        legs, chunks = self.trader.prepare_batch(orders, infos)
+        results = await asyncio.gather(*(
+            self.send_batch([body for _, body in chunk]) for chunk in chunks
+        ))
+        for chunk, result in zip(chunks, results):
+            self.trader.apply_batch_result(chunk, result)
+        return self.trader.batch_summary(legs)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,143 @@
+import os
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 대기열 설정
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 4))
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 100))
+SIGNAL_HISTORY = int(os.getenv('SIGNAL_HISTORY', 1000))
+
+
+def signal_symbols(symbol):
+    """신호가 다루는 심볼들을 정렬해서 (배치는 'BTC-USDT-SWAP,ETH-USDT-SWAP'을 나눠서)"""
+    return sorted(set(symbol.split(','))) if symbol else [symbol]
+
+
+class QueueFull(Exception):
+    """대기열이 가득 차서 신호를 받을 수 없음"""
+
+
+class SignalQueue:
+    """웹훅 신호를 받아 두었다가 워커 스레드에서 실행하는 대기열
+
+    submit()은 신호를 넣고 id만 돌려주므로 웹훅 응답이 주문 실행을
+    기다리지 않는다. 대기열이 가득 차면 QueueFull을 던져서 호출한 쪽이
+    503으로 되돌려 보내게 한다. 최근 SIGNAL_HISTORY개 신호의 상태를
+    id로 조회할 수 있다.
+    """
+
+    def __init__(self, handler, workers=WEBHOOK_WORKERS, max_depth=WEBHOOK_QUEUE_SIZE,
+                 history=SIGNAL_HISTORY):
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.history = history
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._waiters = {}
+        self.rejected = 0
+
+    def start(self):
+        """워커 스레드 시작 (fork 이후 워커에서는 다시 시작)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'signal-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"🧵 신호 워커 {self.workers}개 시작 (대기열 {self.max_depth})")
+
+    def submit(self, signal, signal_id=None):
+        """신호를 대기열에 넣고 signal id를 반환"""
+        if self._pid != os.getpid():
+            self.start()
+        record = self._new_record(signal, signal_id)
+        with self._lock:
+            try:
+                self._queue.put_nowait((record, signal))
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFull(f"대기열 가득 참 ({self.max_depth})")
+            self._remember(record)
+        return record['id']
+
+    def execute(self, signal, signal_id=None):
+        """대기열을 거쳐 실행하고 끝날 때까지 기다려 결과를 반환 (동기 웹훅용)"""
+        done = threading.Event()
+        signal_id = signal_id or uuid.uuid4().hex
+        self._waiters[signal_id] = done
+        try:
+            self.submit(signal, signal_id)
+            done.wait()
+        finally:
+            self._waiters.pop(signal_id, None)
+        return done.result
+
+    def _new_record(self, signal, signal_id):
+        return {
+            'id': signal_id or uuid.uuid4().hex,
+            'status': 'queued',
+            'symbol': signal.get('symbol'),
+            'action': signal.get('action'),
+            'received_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None
+        }
+
+    def _remember(self, record):
+        self._records[record['id']] = record
+        while len(self._records) > self.history:
+            self._records.popitem(last=False)
+
+    def status(self, signal_id):
+        with self._lock:
+            record = self._records.get(signal_id)
+            return dict(record) if record else None
+
+    def snapshot(self):
+        """모니터링용 상태"""
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'workers': self.workers,
+            'rejected': self.rejected
+        }
+
+    def _run(self):
+        while True:
+            record, signal = self._queue.get()
+            self._execute(record, signal)
+            self._queue.task_done()
+
+    def _execute(self, record, signal):
+        record['status'] = 'running'
+        record['started_at'] = time.time()
+        try:
+            result = self.handler(signal)
+            record['status'] = 'done' if result.get('code') == '0' else 'failed'
+            record['result'] = result
+        except Exception as e:
+            logger.error(f"❌ 신호 실행 오류 ({record['id']}): {e}")
+            record['status'] = 'failed'
+            record['result'] = {"code": "error", "msg": str(e)}
+        record['finished_at'] = time.time()
+        logger.info(f"🏁 신호 처리 완료: {record['id']} {record['status']} "
+                    f"({record['finished_at'] - record['received_at']:.3f}s)")
+        waiter = self._waiters.get(record['id'])
+        if waiter is not None:
+            waiter.result = record['result']
+            waiter.set()
@@ -0,0 +1,126 @@
+from decimal import Decimal
+
+# 상품 규칙(lotSz, minSz, tickSz)을 정수 단위로 미리 바꿔 두고 수량·가격을 정수 연산으로 맞춘다.
+# float로 0.3 / 0.1 같은 계산을 하면 0.30000000000000004 같은 값이 나와 OKX가 거절한다.
+
+POW10 = [10 ** n for n in range(64)]
+# 이보다 작은 정수는 float로 정확히 표현된다
+FLOAT_EXACT = 2 ** 53
+
+
+def parse_decimal(value):
+    """숫자나 문자열을 value == mantissa / 10**exponent 인 정수 쌍으로
+
+    float는 repr(가장 짧은 10진 표현)을 쓰므로 0.1은 정확히 (1, 1)이 된다.
+    소수 자릿수가 너무 많거나 숫자가 아니면 ValueError.
+    """
+    text = value.strip() if isinstance(value, str) else repr(value)
+    if 'e' in text or 'E' in text:
+        sign, digits, exponent = Decimal(text).as_tuple()
+        mantissa = int(''.join(map(str, digits))) * (-1 if sign else 1)
+        if exponent > 0:
+            return mantissa * 10 ** exponent, 0
+        exponent = -exponent
+    else:
+        whole, _, frac = text.partition('.')
+        mantissa, exponent = int(whole + frac), len(frac)
+    if exponent >= len(POW10) - 16:
+        raise ValueError(f"소수 자릿수가 너무 많음: {text}")
+    return mantissa, exponent
+
+
+def round_div(numerator, denominator):
+    """정수 나눗셈 반올림 (0.5는 올림, 양수 기준)"""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def format_units(units, scale):
+    """10**-scale 단위 정수를 지수 표기·끝자리 0 없는 문자열로 (1500, 3 → '1.5')"""
+    if scale == 0:
+        return str(units)
+    sign = '-' if units < 0 else ''
+    whole, frac = divmod(abs(units), POW10[scale])
+    frac = str(frac).rjust(scale, '0').rstrip('0')
+    return f"{sign}{whole}.{frac}" if frac else f"{sign}{whole}"
+
+
+class Step:
+    """lotSz 같은 호가 단위 하나 (units / 10**scale)"""
+
+    __slots__ = ('units', 'scale', 'text', 'pow', 'pow_float')
+
+    def __init__(self, value):
+        self.units, self.scale = parse_decimal(value)
+        self.text = format_units(self.units, self.scale)
+        self.pow = POW10[self.scale]
+        self.pow_float = float(self.pow)
+
+    def exact(self, value):
+        """value가 단위의 정확한 배수인 float면 10**-scale 단위 정수, 아니면 None
+
+        round(value * 10**scale) / 10**scale이 같은 float로 돌아오면 그 10진수가
+        value의 가장 짧은 표현이다 (정수 / 정수 나눗셈은 정확히 반올림된다).
+        문자열로 바꾸지 않으므로 웹훅 수량 대부분이 이 경로로 끝난다.
+        """
+        if value.__class__ is not float:
+            return None
+        units = round(value * self.pow_float)
+        if units / self.pow != value or units % self.units or not -FLOAT_EXACT < units < FLOAT_EXACT:
+            return None
+        return units
+
+    def ratio(self, value):
+        """value / 단위를 정확한 분수 (분자, 분모)로"""
+        mantissa, exponent = parse_decimal(value)
+        return mantissa * POW10[self.scale], POW10[exponent] * self.units
+
+    def count(self, value):
+        """value에 가장 가까운 단위 배수 개수"""
+        return round_div(*self.ratio(value))
+
+    def format(self, count):
+        return format_units(count * self.units, self.scale)
+
+
+class InstrumentPrecision:
+    """상품 하나의 주문 수량·가격 규칙을 정수 단위로 미리 계산해 둔 것
+
+    상품 캐시를 채울 때 상품마다 한 번 만들고, 주문할 때는 정수 연산과
+    문자열 조립만 한다.
+    """
+
+    __slots__ = ('lot', 'min_count', 'min_units', 'min_text', 'tick')
+
+    def __init__(self, lot_sz, min_sz, tick_sz=None):
+        self.lot = Step(lot_sz)
+        min_step = Step(min_sz)
+        # 최소 수량을 lot 단위 개수로 (최소 수량은 lot의 배수)
+        self.min_count = -(-min_step.units * POW10[self.lot.scale] // (POW10[min_step.scale] * self.lot.units))
+        self.min_units = self.min_count * self.lot.units
+        self.min_text = min_step.text
+        self.tick = Step(tick_sz) if tick_sz else None
+
+    @classmethod
+    def from_info(cls, info):
+        return cls(info['lotSz'], info['minSz'], info.get('tickSz'))
+
+    def size(self, amount):
+        """주문 수량을 lot 배수로 반올림 → (sz 문자열, 조정 여부, 최소 수량 미만 여부)
+
+        최소 수량은 반올림 전 수량으로 비교한다.
+        """
+        units = self.lot.exact(amount)
+        if units is not None:
+            return format_units(units, self.lot.scale), False, units < self.min_units
+        numerator, denominator = self.lot.ratio(amount)
+        count = round_div(numerator, denominator)
+        return self.lot.format(count), numerator % denominator != 0, numerator < self.min_count * denominator
+
+    def price(self, price):
+        """가격을 tick 배수로 반올림한 px 문자열"""
+        if self.tick is None:
+            return format_units(*parse_decimal(price))
+        units = self.tick.exact(price)
+        if units is not None:
+            return format_units(units, self.tick.scale)
+        return self.tick.format(self.tick.count(price))
@@ -0,0 +1,207 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 헬스체크 설정
+PROXY_CHECK_URL = os.getenv('PROXY_CHECK_URL', 'http://httpbin.org/ip')
+PROXY_CHECK_INTERVAL = float(os.getenv('PROXY_CHECK_INTERVAL', 60))
+PROXY_CHECK_TIMEOUT = float(os.getenv('PROXY_CHECK_TIMEOUT', 5))
+PROXY_EVICT_AFTER = int(os.getenv('PROXY_EVICT_AFTER', 3))
+PROXY_REVIVE_EVERY = int(os.getenv('PROXY_REVIVE_EVERY', 5))
+
+# 점수 계산용 상수
+EWMA_ALPHA = 0.3
+FAILURE_PENALTY_WINDOW = 60.0
+FAILURE_PENALTY = 5.0
+
+
+class ProxyStats:
+    """프록시 하나의 상태 (지연시간 EWMA, 성공률, 마지막 실패 시각)"""
+
+    def __init__(self, address):
+        self.address = address
+        self.proxies = {
+            'http': f'http://{address}',
+            'https': f'http://{address}'
+        }
+        self.latency_ewma = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self.last_check = 0.0
+
+    @property
+    def success_rate(self):
+        total = self.successes + self.failures
+        return self.successes / total if total else 0.0
+
+    def record_success(self, latency):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency_ewma
+        self.successes += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_failure = time.time()
+
+    def score(self, now=None):
+        """낮을수록 좋은 점수 (초 단위 지연시간을 성공률로 보정)"""
+        if self.latency_ewma is None:
+            return float('inf')
+        now = now or time.time()
+        score = self.latency_ewma / max(self.success_rate, 0.05)
+        if now - self.last_failure < FAILURE_PENALTY_WINDOW:
+            score += FAILURE_PENALTY
+        return score
+
+    def to_dict(self):
+        return {
+            'address': self.address,
+            'latency_ewma': round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            'success_rate': round(self.success_rate, 3),
+            'successes': self.successes,
+            'failures': self.failures,
+            'last_failure': self.last_failure or None,
+        }
+
+
+class ProxyPool:
+    """백그라운드에서 프록시를 헬스체크하고 순위를 유지하는 풀
+
+    요청 경로에서는 미리 계산된 최선의 프록시를 O(1)로 돌려주기만 하고
+    프로빙은 전부 백그라운드 스레드가 담당한다. 연속으로 실패한 프록시는
+    퇴출되었다가 몇 주기에 한 번씩 다시 검사해서 살아나면 복귀한다.
+    """
+
+    def __init__(self, addresses, check_url=PROXY_CHECK_URL, interval=PROXY_CHECK_INTERVAL,
+                 timeout=PROXY_CHECK_TIMEOUT, evict_after=PROXY_EVICT_AFTER):
+        self.check_url = check_url
+        self.interval = interval
+        self.timeout = timeout
+        self.evict_after = evict_after
+        self._stats = {address: ProxyStats(address) for address in addresses}
+        self._by_url = {stats.proxies['https']: stats for stats in self._stats.values()}
+        self._live = list(self._stats.values())
+        self._evicted = []
+        self._ranking = []
+        self._best = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._cycles = 0
+
+    def start(self):
+        """헬스체크 스레드 시작 (fork 이후 워커에서는 다시 시작)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='proxy-pool', daemon=True)
+            self._thread.start()
+        logger.info(f"🩺 프록시 헬스체크 시작 ({len(self._stats)}개, {self.interval:.0f}초 주기)")
+
+    def stop(self):
+        self._stop.set()
+
+    def best(self, n):
+        """점수 순으로 상위 n개 살아있는 프록시"""
+        if self._pid != os.getpid():
+            self.start()
+        return [stats.proxies for stats in self._ranking[:n]]
+
+    def report(self, proxies, ok, latency=None):
+        """실제 요청 결과를 반영 (실패하면 즉시 순위를 다시 계산)"""
+        stats = self._by_url.get(proxies.get('https')) if proxies else None
+        if stats is None:
+            return
+        with self._lock:
+            if ok:
+                stats.record_success(latency)
+            else:
+                stats.record_failure()
+                self._evict_if_dead(stats)
+                self._rerank()
+
+    def snapshot(self):
+        """모니터링용 상태"""
+        with self._lock:
+            return {
+                'best': self._best.address if self._best else None,
+                'live': [stats.to_dict() for stats in self._ranking],
+                'evicted': [stats.address for stats in self._evicted],
+            }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check_all()
+            except Exception as e:
+                logger.error(f"❌ 프록시 헬스체크 오류: {e}")
+            self._stop.wait(self.interval)
+
+    def check_all(self):
+        """살아있는 프록시 전부와 (몇 주기마다) 퇴출된 프록시를 병렬로 검사"""
+        self._cycles += 1
+        targets = list(self._live)
+        if self._evicted and self._cycles % PROXY_REVIVE_EVERY == 0:
+            targets += self._evicted
+        if not targets:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            results = list(executor.map(self._probe, targets))
+
+        with self._lock:
+            for stats, latency in zip(targets, results):
+                stats.last_check = time.time()
+                if latency is not None:
+                    stats.record_success(latency)
+                    if stats in self._evicted:
+                        self._evicted.remove(stats)
+                        self._live.append(stats)
+                        logger.info(f"♻️ 프록시 복귀: {stats.address}")
+                else:
+                    stats.record_failure()
+                    self._evict_if_dead(stats)
+            self._rerank()
+
+        if self._best:
+            logger.info(f"✅ 최선 프록시: {self._best.address} ({self._best.latency_ewma:.2f}s)")
+        else:
+            logger.warning("⚠️ 작동하는 프록시 없음. 직접 연결 사용")
+
+    def _probe(self, stats):
+        started = time.monotonic()
+        try:
+            response = requests.get(self.check_url, proxies=stats.proxies, timeout=self.timeout)
+            if response.status_code == 200:
+                return time.monotonic() - started
+        except Exception:
+            pass
+        return None
+
+    def _evict_if_dead(self, stats):
+        if stats in self._live and stats.consecutive_failures >= self.evict_after:
+            self._live.remove(stats)
+            self._evicted.append(stats)
+            logger.warning(f"🗑️ 프록시 퇴출: {stats.address}")
+
+    def _rerank(self):
+        now = time.time()
+        ranking = [stats for stats in self._live if stats.latency_ewma is not None]
+        ranking.sort(key=lambda stats: stats.score(now))
+        self._ranking = ranking
+        self._best = ranking[0] if ranking else None
@@ -0,0 +1,237 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+import serializer
+from transport import DIRECT_ROUTE
+from breaker import CircuitOpen
+
+logger = logging.getLogger(__name__)
+
+# 경로 경쟁 설정
+RACE_ROUTES = int(os.getenv('RACE_ROUTES', 2))
+RACE_WORKERS = int(os.getenv('RACE_WORKERS', 16))
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 10))
+# 주문은 연결이 이 시간(초) 안에 안 되면 다음 경로로 바로 넘어감
+ORDER_CONNECT_TIMEOUT = float(os.getenv('ORDER_CONNECT_TIMEOUT', 2))
+
+# 직접 연결에 붙이는 브라우저 헤더 (봇 탐지 회피)
+DIRECT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+def route_name(proxies):
+    return proxies['https'] if proxies else DIRECT_ROUTE
+
+
+def route_kwargs(proxies, kwargs):
+    """경로 하나에 보낼 요청 인자 (직접 연결이면 브라우저 헤더 추가)"""
+    kwargs = dict(kwargs)
+    if proxies:
+        kwargs['proxies'] = proxies
+    else:
+        kwargs['headers'] = dict(kwargs.get('headers') or {}, **DIRECT_HEADERS)
+    return kwargs
+
+
+def safe_to_resend(error, data):
+    """주문을 다른 경로로 다시 보내도 되는지
+
+    연결 단계에서 실패했으면 요청이 나가지 않았으므로 항상 안전하다. 응답을
+    기다리다 실패했으면 clOrdId가 붙은 주문만 (거래소가 중복을 거절하므로) 다시 보낸다.
+    """
+    if isinstance(error, (requests.exceptions.ConnectTimeout, requests.exceptions.ProxyError)):
+        return True
+    if isinstance(error, CircuitOpen):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    if isinstance(reason, NewConnectionError):
+        return True
+    return has_client_order_id(data)
+
+
+def has_client_order_id(data):
+    return bool(data) and b'"clOrdId"' in data
+
+
+def check(response):
+    """응답을 (쓸 수 있는지, 경로가 정상인지)로 판정
+
+    JSON이 아닌 차단 페이지나 5xx는 경로 실패다. OKX가 JSON으로 돌려준 4xx
+    (401 인증·타임스탬프, 429 한도, 400 파라미터)는 경로는 제대로 동작한
+    것이므로 서킷·프록시 점수에는 성공으로 치고, 경쟁에서만 이기지 못한다.
+    """
+    try:
+        serializer.loads(response.content)
+    except Exception:
+        return False, False
+    return response.status_code < 400, response.status_code < 500
+
+
+def is_signed(kwargs):
+    """서명된 요청인지 (OKX는 개인 엔드포인트 한도를 IP가 아니라 계정별로 센다)"""
+    return 'OK-ACCESS-SIGN' in (kwargs.get('headers') or {})
+
+
+class RouteRacer:
+    """프록시·직접 연결 경로를 경쟁시키거나 빠르게 갈아타는 요청 실행기
+
+    서명 없는 조회(GET)는 점수가 좋은 경로 RACE_ROUTES개에 동시에 보내서 먼저 온
+    정상 응답(4xx/5xx가 아닌 JSON)을 쓰고, 모두 실패하면 남은 경로로 차례로 넘어간다.
+    서명된 조회는 경쟁시키면 계정 한도를 경로 수만큼 쓰므로 한 경로씩 보낸다.
+    주문(POST)은 중복 체결을 막기 위해 한 번에 한 경로로만 보내되 연결
+    제한 시간을 짧게 잡아서, 죽은 프록시에서 15초씩 기다리지 않게 한다.
+    경로별로 몇 번 이겼는지(응답을 돌려줬는지) 센다. 서킷이 열린 경로는
+    건너뛰고, 모든 경로가 막혀 있으면 요청 없이 CircuitOpen을 던진다.
+    """
+
+    def __init__(self, proxy_pool, breakers, routes=RACE_ROUTES, workers=RACE_WORKERS):
+        self.proxy_pool = proxy_pool
+        self.breakers = breakers
+        self.width = max(1, routes)
+        self.workers = workers
+        self.wins = {}
+        self.races = 0
+        self.failovers = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def routes(self):
+        """시도할 경로 순서 (서킷이 닫힌 점수 순 프록시들, 마지막은 직접 연결)
+
+        여기서는 서킷 상태만 보고, half-open 시험 요청 자리는 실제로 보낼 때
+        admit()에서 차지한다 (대비용 직접 연결이 안 쓰이고 시험 기회만 날리지 않게).
+        """
+        routes = []
+        for proxies in self.proxy_pool.best(None):
+            if len(routes) == self.width:
+                break
+            if self.breakers.get(route_name(proxies)).available():
+                routes.append(proxies)
+        if self.breakers.get(DIRECT_ROUTE).available():
+            routes.append(None)
+        if not routes:
+            raise CircuitOpen("모든 경로의 서킷이 열려 있음")
+        return routes
+
+    def request(self, transport, method, url, metrics, **kwargs):
+        with metrics.time('proxy'):
+            routes = self.routes()
+        if method.upper() == 'GET' and len(routes) > 1 and not is_signed(kwargs):
+            return self.race(transport, routes, method, url, metrics, **kwargs)
+        return self.failover(transport, routes, method, url, metrics, **kwargs)
+
+    def race(self, transport, routes, method, url, metrics, **kwargs):
+        """앞쪽 경로들에 동시에 보내고 먼저 성공한 응답 반환"""
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        racing, rest = routes[:self.width], routes[self.width:]
+        self.races += 1
+        executor = self._get_executor()
+        pending = {
+            executor.submit(contextvars.copy_context().run, self._send, transport, proxies, method, url, metrics, kwargs): proxies
+            for proxies in racing
+        }
+        error = bad = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                proxies = pending.pop(future)
+                try:
+                    response, ok = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if not ok:
+                    # 차단 페이지나 오류 응답은 이기지 못하고 나머지 경로를 계속 기다린다
+                    bad = response
+                    continue
+                # 진 경로는 끝까지 돌게 두고 결과만 프록시 점수에 반영된다
+                self.record_win(route_name(proxies))
+                return response
+        logger.warning(f"⚠️ 경쟁 경로 모두 실패, 남은 경로로 재시도: {error or bad.status_code}")
+        if rest:
+            return self.failover(transport, rest, method, url, metrics, **kwargs)
+        if bad is not None:
+            return bad
+        raise error
+
+    def failover(self, transport, routes, method, url, metrics, **kwargs):
+        """경로를 하나씩 시도 (POST는 다시 보내도 안전할 때만 다음 경로로)"""
+        if method.upper() != 'GET':
+            kwargs.setdefault('timeout', (ORDER_CONNECT_TIMEOUT, REQUEST_TIMEOUT))
+        else:
+            kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        for i, proxies in enumerate(routes):
+            last = i == len(routes) - 1
+            try:
+                response, ok = self._send(transport, proxies, method, url, metrics, kwargs)
+            except Exception as e:
+                if last or (method.upper() != 'GET' and not safe_to_resend(e, kwargs.get('data'))):
+                    logger.error(f"❌ 요청 실패 ({route_name(proxies)}): {e}")
+                    raise
+                self.failovers += 1
+                logger.warning(f"⚠️ {route_name(proxies)} 경로 실패, 다음 경로로: {e}")
+                continue
+            # 오류 응답은 다시 보내도 안전할 때만 다음 경로로 (마지막 경로면 그대로 돌려준다)
+            if not ok and not last and (method.upper() == 'GET' or has_client_order_id(kwargs.get('data'))):
+                self.failovers += 1
+                logger.warning(f"⚠️ {route_name(proxies)} 경로 오류 응답({response.status_code}), 다음 경로로")
+                continue
+            if ok:
+                self.record_win(route_name(proxies))
+            return response
+
+    def admit(self, proxies):
+        """이 경로로 보내기 직전에 서킷 확인 (막혀 있으면 보내지 않고 CircuitOpen)"""
+        if not self.breakers.get(route_name(proxies)).allow():
+            raise CircuitOpen(f"{route_name(proxies)} 경로 서킷이 열려 있음")
+
+    def _send(self, transport, proxies, method, url, metrics, kwargs):
+        """경로 하나로 보내고 (응답, 정상 여부)를 반환"""
+        self.admit(proxies)
+        started = time.monotonic()
+        try:
+            with metrics.time('http'):
+                response = transport.request(method, url, **route_kwargs(proxies, kwargs))
+        except Exception:
+            self.report(proxies, False)
+            raise
+        ok, healthy = check(response)
+        self.report(proxies, healthy, time.monotonic() - started)
+        return response, ok
+
+    def report(self, proxies, ok, latency=None):
+        """경로 하나의 결과를 서킷과 프록시 점수에 반영"""
+        self.breakers.get(route_name(proxies)).record(ok)
+        if proxies:
+            self.proxy_pool.report(proxies, ok, latency)
+
+    def record_win(self, name):
+        with self._lock:
+            self.wins[name] = self.wins.get(name, 0) + 1
+
+    def _get_executor(self):
+        with self._lock:
+            # fork 이후 워커에서는 스레드가 없으므로 새로 만든다
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='route-race')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def snapshot(self):
+        with self._lock:
+            wins = dict(self.wins)
+        return {'races': self.races, 'failovers': self.failovers, 'wins': wins}
@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# OKX 문서 기준 엔드포인트 그룹별 한도 (요청 수, 초)
+# trade: 주문 60회/2초, account: 포지션·잔고 10회/2초,
+# market: 티커 20회/2초, public: 상품 정보 20회/2초
+DEFAULT_RATE_LIMITS = {
+    'trade': (60, 2),
+    'account': (10, 2),
+    'market': (20, 2),
+    'public': (20, 2),
+}
+
+
+def parse_rate_limits(value):
+    """OKX_RATE_LIMITS 환경변수(예: trade=60/2,account=10/2)를 한도 딕셔너리로 변환"""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        group, spec = item.split('=', 1)
+        count, _, seconds = spec.partition('/')
+        limits[group.strip()] = (int(count), float(seconds or 1))
+    return limits
+
+
+def endpoint_group(url):
+    """URL에서 엔드포인트 그룹 추출 (/api/v5/trade/order → trade)"""
+    parts = urlsplit(url).path.split('/')
+    if len(parts) > 3 and parts[1] == 'api':
+        return parts[3]
+    return None
+
+
+class TokenBucket:
+    """토큰 버킷 (토큰이 남아 있으면 바로 통과, 비었을 때만 대기)"""
+
+    def __init__(self, capacity, period):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """토큰 하나를 예약하고 기다려야 할 시간(초)을 반환 (대기는 호출한 쪽에서)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self):
+        """토큰 하나를 예약하고 필요한 만큼만 대기, 대기한 시간(초)을 반환"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    @property
+    def level(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class RateLimiter:
+    """OKX 엔드포인트 그룹별 토큰 버킷 모음"""
+
+    def __init__(self, limits=None):
+        limits = limits or parse_rate_limits(os.getenv('OKX_RATE_LIMITS'))
+        self.buckets = {
+            group: TokenBucket(count, period)
+            for group, (count, period) in limits.items()
+        }
+
+    def reserve(self, url):
+        """url의 그룹 버킷에서 토큰을 예약하고 기다려야 할 시간(초)을 반환"""
+        bucket = self.buckets.get(endpoint_group(url))
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve()
+        if wait > 0:
+            logger.warning(f"⏳ 요청 한도 대기: {endpoint_group(url)} {wait:.3f}s")
+        return wait
+
+    def acquire(self, url):
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def snapshot(self):
+        """그룹별 남은 토큰 수 (모니터링용)"""
+        return {
+            group: {
+                'tokens': round(bucket.level, 2),
+                'capacity': bucket.capacity
+            }
+            for group, bucket in self.buckets.items()
+        }
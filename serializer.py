@@ -0,0 +1,35 @@
+import json
+
+# 설치되어 있으면 orjson → ujson 순으로 빠른 JSON 라이브러리를 쓰고, 없으면 표준 json
+# loads()는 bytes를 그대로 받고 (텍스트 디코딩 없이), dumps()는 공백 없는 bytes를 돌려준다.
+try:
+    import orjson
+
+    BACKEND = 'orjson'
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+except ImportError:
+    try:
+        import ujson
+
+        BACKEND = 'ujson'
+
+        def loads(data):
+            return ujson.loads(data)
+
+        def dumps(obj):
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode()
+
+    except ImportError:
+        BACKEND = 'json'
+
+        def loads(data):
+            return json.loads(data)
+
+        def dumps(obj):
+            return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
@@ -0,0 +1,195 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# 커넥션 풀 설정
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+HTTP_MAX_IDLE = float(os.getenv('HTTP_MAX_IDLE', 60))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 1))
+HTTP_FANOUT_WORKERS = int(os.getenv('HTTP_FANOUT_WORKERS', 8))
+
+DIRECT_ROUTE = 'direct'
+
+
+class ConnectionCounters:
+    """요청 수와 새로 연 커넥션 수를 세서 재사용 비율을 계산"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def add_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reuse_ratio(self):
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.new_connections / self.requests)
+
+
+def _counting_pool(base, counters):
+    class CountingPool(base):
+        def _new_conn(self):
+            counters.add_connection()
+            return super()._new_conn()
+    return CountingPool
+
+
+class CountingAdapter(HTTPAdapter):
+    """새 TCP 커넥션이 열릴 때마다 카운터를 올리는 어댑터"""
+
+    def __init__(self, counters, **kwargs):
+        self.counters = counters
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._instrument(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._instrument(manager)
+        return manager
+
+    def _instrument(self, manager):
+        manager.pool_classes_by_scheme = {
+            scheme: _counting_pool(pool_class, self.counters)
+            for scheme, pool_class in manager.pool_classes_by_scheme.items()
+        }
+
+
+class Route:
+    """경로(직접 연결 또는 프록시 하나)별 keep-alive 세션"""
+
+    def __init__(self, name, session):
+        self.name = name
+        self.session = session
+        self.counters = session.adapters['https://'].counters
+        self.last_used = time.monotonic()
+
+
+class Transport:
+    """경로별 keep-alive 세션을 소유하는 장수 HTTP 전송 계층
+
+    직접 연결 하나와 프록시마다 하나씩 Session을 두고 재사용하므로
+    매 요청마다 TCP+TLS 핸드셰이크를 새로 하지 않는다. max_idle 이상
+    쓰이지 않은 세션은 닫고 다음 요청에서 새로 만든다.
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, max_idle=HTTP_MAX_IDLE, retries=HTTP_RETRIES):
+        self.pool_size = pool_size
+        self.max_idle = max_idle
+        self.retries = retries
+        self._routes = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _retry_policy(self):
+        # 주문(POST)은 중복 체결 위험이 있어 재시도하지 않음
+        return Retry(
+            total=self.retries,
+            connect=self.retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+
+    def _new_session(self, proxies):
+        session = requests.Session()
+        counters = ConnectionCounters()
+        adapter = CountingAdapter(
+            counters,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=self._retry_policy()
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if proxies:
+            session.proxies.update(proxies)
+        return session
+
+    def route_for(self, proxies=None):
+        name = proxies['https'] if proxies else DIRECT_ROUTE
+        now = time.monotonic()
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork 이전에 열린 소켓을 부모와 같이 쓰면 요청이 섞이므로 닫지 않고 버린다
+                self._routes = {}
+                self._pid = os.getpid()
+            route = self._routes.get(name)
+            if route is not None and now - route.last_used > self.max_idle:
+                logger.info(f"🔌 유휴 세션 종료: {name}")
+                route.session.close()
+                route = None
+            if route is None:
+                route = Route(name, self._new_session(proxies))
+                self._routes[name] = route
+            route.last_used = now
+        return route
+
+    def request(self, method, url, proxies=None, **kwargs):
+        route = self.route_for(proxies)
+        route.counters.add_request()
+        return route.session.request(method.upper(), url, **kwargs)
+
+    def fan_out(self, calls):
+        """인자 없는 호출 목록을 동시에 실행하고 입력 순서대로 결과를 반환"""
+        if len(calls) <= 1:
+            return [call() for call in calls]
+        with self._lock:
+            # fork 이후 워커에서는 스레드가 없으므로 새로 만든다
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=HTTP_FANOUT_WORKERS, thread_name_prefix='fan-out'
+                )
+                self._executor_pid = os.getpid()
+            executor = self._executor
+        # 호출마다 현재 컨텍스트(심볼 라벨 등)를 복사해서 넘긴다
+        futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self._lock:
+            for route in self._routes.values():
+                route.session.close()
+            self._routes.clear()
+
+    def stats(self):
+        """경로별 요청 수, 새 커넥션 수, 재사용 비율"""
+        with self._lock:
+            routes = list(self._routes.values())
+        total_requests = sum(route.counters.requests for route in routes)
+        total_connections = sum(route.counters.new_connections for route in routes)
+        return {
+            'requests': total_requests,
+            'new_connections': total_connections,
+            'reuse_ratio': round(max(0.0, 1 - total_connections / total_requests), 3) if total_requests else 0.0,
+            'routes': {
+                route.name: {
+                    'requests': route.counters.requests,
+                    'new_connections': route.counters.new_connections,
+                    'reuse_ratio': round(route.counters.reuse_ratio, 3)
+                }
+                for route in routes
+            }
+        }
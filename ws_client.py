@@ -0,0 +1,108 @@
+import os
+import time
+import logging
+import threading
+
+import websocket
+
+import serializer
+
+logger = logging.getLogger(__name__)
+
+# 웹소켓 공통 설정
+WS_PING_INTERVAL = float(os.getenv('WS_PING_INTERVAL', 20))
+WS_RECONNECT_MAX = float(os.getenv('WS_RECONNECT_MAX', 30))
+
+
+class WsClient:
+    """OKX 웹소켓 연결 하나를 백그라운드 스레드로 유지하는 기반 클래스
+
+    연결이 끊기면 지수 백오프로 다시 붙고, 조용한 구간에는 OKX 규칙대로
+    'ping' 문자열을 보낸다. 하위 클래스는 on_open()에서 로그인/구독을
+    하고 on_message()에서 푸시 데이터를 처리한다.
+    """
+
+    def __init__(self, url, name):
+        self.url = url
+        self.name = name
+        self.connected = False
+        self.last_message = None
+        self._ws = None
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+
+    def send(self, message):
+        ws = self._ws
+        if ws is None or not self.connected:
+            raise ConnectionError(f"{self.name} 연결 안 됨")
+        payload = message if isinstance(message, str) else serializer.dumps(message).decode()
+        with self._send_lock:
+            ws.send(payload)
+
+    def on_open(self):
+        pass
+
+    def on_message(self, message):
+        pass
+
+    def on_close(self):
+        pass
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._ws = websocket.create_connection(self.url, timeout=10)
+                self.connected = True
+                logger.info(f"🔗 웹소켓 연결: {self.name}")
+                self.on_open()
+                backoff = 1.0
+                self._receive_loop()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"⚠️ 웹소켓 오류 ({self.name}): {e}")
+            finally:
+                self.connected = False
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                self._ws = None
+                self.on_close()
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, WS_RECONNECT_MAX)
+
+    def _receive_loop(self):
+        self._ws.settimeout(WS_PING_INTERVAL)
+        pinged = False
+        while not self._stop.is_set():
+            try:
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                if pinged:
+                    raise ConnectionError("pong 응답 없음")
+                self.send('ping')
+                pinged = True
+                continue
+            pinged = False
+            self.last_message = time.time()
+            if raw == 'pong' or not raw:
+                continue
+            self.on_message(serializer.loads(raw))
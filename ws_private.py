@@ -0,0 +1,242 @@
+import os
+import time
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from ws_client import WsClient
+
+logger = logging.getLogger(__name__)
+
+# 이 시간(초) 동안 푸시가 없으면 메모리 장부를 믿지 않고 REST로 조회
+WS_STALE_AFTER = float(os.getenv('WS_STALE_AFTER', 30))
+WS_ORDER_HISTORY = 500
+# 웹소켓 주문 ack를 기다리는 최대 시간(초), 넘으면 REST로 다시 보냄
+WS_ORDER_TIMEOUT = float(os.getenv('WS_ORDER_TIMEOUT', 5))
+# 접수된 주문이 이 시간(초) 안에 포지션 푸시로 반영되지 않으면 더 기다리지 않는다
+# (포지션이 없는 심볼이나 체결 안 된 주문은 포지션 푸시가 오지 않는다)
+WS_ACK_TIMEOUT = float(os.getenv('WS_ACK_TIMEOUT', 10))
+# 더 이상 포지션을 바꾸지 않는 주문 상태
+FINAL_ORDER_STATES = ('filled', 'canceled', 'mmp_canceled')
+
+
+def private_ws_url(simulated):
+    default = 'wss://wspap.okx.com:8443/ws/v5/private' if simulated == '1' else 'wss://ws.okx.com:8443/ws/v5/private'
+    return os.getenv('OKX_WS_PRIVATE_URL', default)
+
+
+class PrivateStream(WsClient):
+    """OKX 프라이빗 웹소켓 (positions, orders, account) 구독으로 유지하는 포지션·잔고 장부
+
+    푸시가 올 때마다 새 dict를 만들어 통째로 바꿔 끼우므로 읽는 쪽은 잠금 없이
+    참조만 가져가면 된다. 연결이 끊기거나 WS_STALE_AFTER 동안 갱신이 없으면
+    stale로 보고 호출한 쪽이 REST로 돌아가게 None을 돌려준다.
+
+    같은 연결로 주문(op: order, batch-orders)도 보낸다. 요청마다 id를 붙이고
+    id별 Future를 걸어 두었다가 수신 스레드가 같은 id의 응답을 받으면 채운다.
+    """
+
+    def __init__(self, url, api_key, passphrase, signer, clock):
+        super().__init__(url, 'okx-ws-private')
+        self.api_key = api_key
+        self.passphrase = passphrase
+        self.signer = signer
+        self.clock = clock
+        self.logged_in = False
+        self._positions = {}
+        self._account = None
+        self._orders = OrderedDict()
+        self._updated = {}
+        # instId별로 접수됐지만 아직 포지션 장부에 반영 안 된 주문 {ordId: ack 시각} (읽기-쓰기 순서 확인용)
+        self._acked = {}
+        self._acked_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}
+
+    @property
+    def ready(self):
+        return self.connected and self.logged_in
+
+    def on_open(self):
+        timestamp = str(int(self.clock.now()))
+        self.send({
+            "op": "login",
+            "args": [{
+                "apiKey": self.api_key,
+                "passphrase": self.passphrase,
+                "timestamp": timestamp,
+                "sign": self.signer.sign(timestamp, 'GET', '/users/self/verify')
+            }]
+        })
+
+    def on_close(self):
+        self.logged_in = False
+        self._updated = {}
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("프라이빗 웹소켓 연결 끊김 (ack 미수신)"))
+
+    def on_message(self, message):
+        if 'id' in message and 'op' in message:
+            self._on_response(message)
+            return
+        event = message.get('event')
+        if event == 'login':
+            if message.get('code') == '0':
+                self.logged_in = True
+                logger.info("🔐 프라이빗 웹소켓 로그인 성공")
+                self.subscribe()
+            else:
+                logger.error(f"❌ 프라이빗 웹소켓 로그인 실패: {message.get('msg')}")
+            return
+        if event == 'error':
+            logger.error(f"❌ 프라이빗 웹소켓 오류: {message.get('code')} {message.get('msg')}")
+            return
+        if event:
+            return
+
+        channel = message.get('arg', {}).get('channel')
+        data = message.get('data', [])
+        if channel == 'positions':
+            self._on_positions(data)
+        elif channel == 'account':
+            self._on_account(data)
+        elif channel == 'orders':
+            self._on_orders(data)
+        else:
+            return
+        self._updated[channel] = time.time()
+
+    def request_future(self, op, args):
+        """id를 붙여 요청을 보내고 응답으로 채워질 Future 반환 (연결 안 됐으면 ConnectionError)"""
+        if not self.ready:
+            raise ConnectionError("프라이빗 웹소켓 로그인 안 됨")
+        request_id = str(next(self._ids))
+        future = Future()
+        future.request_id = request_id
+        self._pending[request_id] = future
+        try:
+            self.send({"id": request_id, "op": op, "args": args})
+        except Exception:
+            self._pending.pop(request_id, None)
+            raise
+        return future
+
+    def request(self, op, args, timeout=WS_ORDER_TIMEOUT):
+        """요청을 보내고 같은 id의 응답을 REST와 같은 모양으로 반환"""
+        future = self.request_future(op, args)
+        try:
+            return future.result(timeout)
+        finally:
+            self.discard(future)
+
+    def discard(self, future):
+        """더 기다리지 않을 요청을 대기 목록에서 뺀다 (타임아웃 후 정리용)"""
+        self._pending.pop(future.request_id, None)
+
+    def _on_response(self, message):
+        future = self._pending.pop(message['id'], None)
+        if future is None or future.done():
+            return
+        future.set_result({
+            "code": message.get('code'),
+            "msg": message.get('msg', ''),
+            "data": message.get('data', []),
+            "source": "ws"
+        })
+
+    def subscribe(self):
+        self.send({
+            "op": "subscribe",
+            "args": [
+                {"channel": "positions", "instType": "ANY"},
+                {"channel": "orders", "instType": "ANY"},
+                {"channel": "account"}
+            ]
+        })
+
+    def _on_positions(self, data):
+        positions = dict(self._positions)
+        with self._acked_lock:
+            for pos in data:
+                self._acked.pop(pos['instId'], None)
+        for pos in data:
+            key = (pos['instId'], pos.get('posSide') or 'net')
+            if pos.get('pos') in (None, '', '0') or float(pos['pos']) == 0:
+                positions.pop(key, None)
+            else:
+                positions[key] = pos
+        self._positions = positions
+
+    def _on_account(self, data):
+        if data:
+            self._account = data[0]
+
+    def _on_orders(self, data):
+        orders = OrderedDict(self._orders)
+        with self._acked_lock:
+            for order in data:
+                if order.get('state') in FINAL_ORDER_STATES:
+                    self._acked.get(order.get('instId'), {}).pop(order['ordId'], None)
+        for order in data:
+            orders[order['ordId']] = order
+            orders.move_to_end(order['ordId'])
+        while len(orders) > WS_ORDER_HISTORY:
+            orders.popitem(last=False)
+        self._orders = orders
+
+    def age(self, channel):
+        updated = self._updated.get(channel)
+        return time.time() - updated if updated else None
+
+    def is_fresh(self, channel):
+        age = self.age(channel)
+        return self.ready and age is not None and age < WS_STALE_AFTER
+
+    def order_acked(self, inst_id, ord_id=None):
+        """접수된 주문 기록 (포지션 푸시, 주문 종료 푸시, WS_ACK_TIMEOUT 중 먼저 오는 것까지 그 심볼 장부는 믿지 않는다)"""
+        with self._acked_lock:
+            self._acked.setdefault(inst_id, {})[ord_id] = time.time()
+
+    def behind(self, symbol=None):
+        """접수된 주문의 체결이 아직 포지션 장부에 안 들어왔을 수 있는지"""
+        expired = time.time() - WS_ACK_TIMEOUT
+        with self._acked_lock:
+            for inst_id in list(self._acked):
+                orders = {ord_id: at for ord_id, at in self._acked[inst_id].items() if at > expired}
+                if orders:
+                    self._acked[inst_id] = orders
+                else:
+                    del self._acked[inst_id]
+            return bool(self._acked) if symbol is None else symbol in self._acked
+
+    def positions(self, symbol=None):
+        """REST 응답과 같은 모양의 포지션 (stale이거나 최근 주문이 아직 반영 안 됐으면 None)"""
+        if not self.is_fresh('positions') or self.behind(symbol):
+            return None
+        data = [
+            pos for (inst_id, _), pos in self._positions.items()
+            if symbol is None or inst_id == symbol
+        ]
+        return {"code": "0", "msg": "", "data": data, "source": "ws", "age": round(self.age('positions'), 3)}
+
+    def balance(self):
+        """REST 응답과 같은 모양의 잔고 (stale이면 None)"""
+        if not self.is_fresh('account') or self._account is None:
+            return None
+        return {"code": "0", "msg": "", "data": [self._account], "source": "ws", "age": round(self.age('account'), 3)}
+
+    def order(self, ord_id):
+        return self._orders.get(ord_id)
+
+    def snapshot(self):
+        return {
+            'connected': self.connected,
+            'logged_in': self.logged_in,
+            'positions': len(self._positions),
+            'pending_requests': len(self._pending),
+            'age': {channel: round(self.age(channel), 3) for channel in self._updated}
+        }
@@ -0,0 +1,98 @@
+import os
+import time
+import logging
+import threading
+from collections import namedtuple
+
+from ws_client import WsClient
+
+logger = logging.getLogger(__name__)
+
+# 이 시간(초)보다 오래된 시세는 믿지 않고 REST로 조회
+WS_TICKER_MAX_AGE = float(os.getenv('WS_TICKER_MAX_AGE', 5))
+
+# 심볼별 최신 시세 (ts: 거래소 시각 ms, received: 수신한 로컬 시각)
+Ticker = namedtuple('Ticker', ['last', 'bid', 'ask', 'ts', 'received'])
+
+
+def public_ws_url(simulated):
+    default = 'wss://wspap.okx.com:8443/ws/v5/public' if simulated == '1' else 'wss://ws.okx.com:8443/ws/v5/public'
+    return os.getenv('OKX_WS_PUBLIC_URL', default)
+
+
+def parse_symbols(value):
+    return [symbol.strip() for symbol in (value or '').split(',') if symbol.strip()]
+
+
+class MarketData(WsClient):
+    """OKX 퍼블릭 웹소켓 tickers 채널로 유지하는 심볼별 시세표
+
+    tickers 푸시에 최우선 호가(bidPx/askPx)까지 들어 있어서 따로 호가 채널을
+    구독하지 않는다. 수신 스레드 하나만 쓰고 값은 바뀌지 않는 Ticker 튜플을
+    통째로 바꿔 끼우므로 읽는 쪽은 잠금 없이 조회한다. 설정에 없는 심볼은
+    처음 조회될 때 구독을 추가한다.
+    """
+
+    def __init__(self, url, symbols=()):
+        super().__init__(url, 'okx-ws-public')
+        # 수신 스레드가 재연결 때 순회하므로 추가할 때는 새 frozenset으로 바꿔 끼운다
+        self.symbols = frozenset(symbols)
+        self._symbols_lock = threading.Lock()
+        self._tickers = {}
+
+    def on_open(self):
+        if self.symbols:
+            self.subscribe(self.symbols)
+
+    def on_close(self):
+        self._tickers = {}
+
+    def on_message(self, message):
+        event = message.get('event')
+        if event == 'error':
+            logger.error(f"❌ 퍼블릭 웹소켓 오류: {message.get('code')} {message.get('msg')}")
+            return
+        if event or message.get('arg', {}).get('channel') != 'tickers':
+            return
+        received = time.time()
+        for tick in message.get('data', []):
+            self._tickers[tick['instId']] = Ticker(
+                float(tick['last']),
+                float(tick['bidPx']) if tick.get('bidPx') else None,
+                float(tick['askPx']) if tick.get('askPx') else None,
+                int(tick['ts']),
+                received
+            )
+
+    def subscribe(self, symbols):
+        self.send({
+            "op": "subscribe",
+            "args": [{"channel": "tickers", "instId": symbol} for symbol in sorted(symbols)]
+        })
+
+    def watch(self, symbol):
+        """구독 목록에 심볼 추가 (연결돼 있으면 바로 구독)"""
+        if symbol in self.symbols:
+            return
+        with self._symbols_lock:
+            self.symbols = self.symbols | {symbol}
+        try:
+            self.subscribe([symbol])
+        except ConnectionError:
+            pass
+
+    def ticker(self, symbol):
+        """최신 시세 (없거나 WS_TICKER_MAX_AGE보다 오래됐으면 None)"""
+        tick = self._tickers.get(symbol)
+        if tick is None or not self.connected or time.time() - tick.received > WS_TICKER_MAX_AGE:
+            return None
+        return tick
+
+    def snapshot(self):
+        now = time.time()
+        tickers = dict(self._tickers)
+        return {
+            'connected': self.connected,
+            'symbols': sorted(self.symbols),
+            'age': {symbol: round(now - tick.received, 3) for symbol, tick in tickers.items()}
+        }